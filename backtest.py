@@ -1,28 +1,19 @@
 import os
 from collections import deque
 from datetime import datetime
-from typing import Deque, Dict, List, Tuple
+from typing import Deque, List, Tuple
 
 import ccxt
-import yaml
 from dotenv import load_dotenv
 
+from config_loader import load_config
 from grid_logic import GridCalculator
+from http_session import build_http_session
 
 
 CONFIG_FILE = "config.yaml"
-
-
-def load_config(path: str = CONFIG_FILE) -> Dict[str, object]:
-    with open(path, encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
-    if not isinstance(data, dict):
-        raise ValueError("config.yaml must map keys to values")
-    required = {"symbol", "lower_price", "upper_price", "grid_levels", "order_size"}
-    missing = required.difference(data)
-    if missing:
-        raise ValueError(f"config.yaml missing values: {', '.join(missing)}")
-    return data
+# Filled side -> (side of the replacement order, direction of its grid step).
+ROTATION = {"buy": ("sell", 1.0), "sell": ("buy", -1.0)}
 
 
 def init_exchange() -> ccxt.Exchange:
@@ -37,25 +28,14 @@ def init_exchange() -> ccxt.Exchange:
             "secret": api_secret,
             "password": passphrase,
         }
-    return ccxt.kucoin({**credentials, "enableRateLimit": True})
+    return ccxt.kucoin({**credentials, "enableRateLimit": True, "session": build_http_session()})
 
 
-def build_initial_orders(
-    symbol: str, levels: List[float], price: float
-) -> List[Dict[str, object]]:
-    orders: List[Dict[str, object]] = []
-    for level in levels:
-        if level == price:
-            continue
-        side = "buy" if level < price else "sell"
-        orders.append(
-            {
-                "symbol": symbol,
-                "side": side,
-                "price": level,
-            }
-        )
-    return orders
+def build_initial_orders(levels: List[float], price: float) -> Tuple[List[float], List[str]]:
+    """Return the opening grid as parallel (prices, sides) lists."""
+    prices = [level for level in levels if level != price]
+    sides = ["buy" if level < price else "sell" for level in prices]
+    return prices, sides
 
 
 def match_order(
@@ -95,7 +75,7 @@ def match_order(
 
 
 def run_backtest() -> None:
-    config = load_config()
+    config = load_config(CONFIG_FILE)
     exchange = init_exchange()
     symbol = config["symbol"]
     order_size = float(config["order_size"])
@@ -114,7 +94,7 @@ def run_backtest() -> None:
         lower_price=lower_price, upper_price=upper_price, grid_levels=grid_levels
     )
     levels = calculator.calculate_levels()
-    orders = build_initial_orders(symbol, levels, start_price)
+    prices, sides = build_initial_orders(levels, start_price)
     grid_step = round(levels[1] - levels[0], 10) if len(levels) > 1 else 0.0
 
     buy_queue: Deque[Tuple[float, float]] = deque()
@@ -125,22 +105,31 @@ def run_backtest() -> None:
 
     for candle in ohlcv:
         _ts, _open, high, low, close, _volume = candle
-        for order in orders[:]:
-            level = float(order["price"])
-            side = order["side"]
-            filled = (side == "buy" and low <= level) or (side == "sell" and high >= level)
-            if not filled:
-                continue
+        filled = [
+            j
+            for j, (level, side) in enumerate(zip(prices, sides))
+            if (side == "buy" and low <= level) or (side == "sell" and high >= level)
+        ]
+        if not filled:
+            continue
+
+        rotated_prices: List[float] = []
+        rotated_sides: List[str] = []
+        for j in filled:
+            level = prices[j]
+            side = sides[j]
             profit, fee = match_order(side, level, order_size, buy_queue, sell_queue)
             grid_profit += profit
             fees += fee
             transactions += 1
-            orders.remove(order)
-            new_price = round(level + grid_step, 10) if side == "buy" else round(level - grid_step, 10)
-            new_side = "sell" if side == "buy" else "buy"
-            orders.append(
-                {"symbol": symbol, "side": new_side, "price": new_price}
-            )
+            opposite_side, sign = ROTATION[side]
+            rotated_prices.append(round(level + sign * grid_step, 10))
+            rotated_sides.append(opposite_side)
+
+        # Open orders keep their order; rotated ones follow in fill order, as remove/append did.
+        filled_set = set(filled)
+        prices = [p for j, p in enumerate(prices) if j not in filled_set] + rotated_prices
+        sides = [s for j, s in enumerate(sides) if j not in filled_set] + rotated_sides
 
     final_price = float(ohlcv[-1][4])
     unrealized = sum((final_price - price) * amount for price, amount in buy_queue)
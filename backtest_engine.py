@@ -3,11 +3,17 @@ import os
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
-import yaml
 
+from config_loader import load_config
 from grid_logic import GridCalculator
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy scan below is used without it
+    njit = None
+
 
 ROOT_DIR = Path(__file__).resolve().parent
 if not (ROOT_DIR / "config.yaml").exists():
@@ -15,17 +21,42 @@ if not (ROOT_DIR / "config.yaml").exists():
 CONFIG_FILE = ROOT_DIR / "config.yaml"
 DATA_DIR = ROOT_DIR / "data"
 
+BUY, SELL = 0, 1
+SIDE_NAMES = ("buy", "sell")
+# Indexed by side code: a filled buy re-enters one step up as a sell, a sell one step down.
+STEP_SIGN = (1.0, -1.0)
 
-def load_config(path: Path = CONFIG_FILE) -> Dict[str, object]:
-    with open(path, encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
-    if not isinstance(data, dict):
-        raise ValueError("config.yaml must map keys to values")
-    required = {"symbol", "lower_price", "upper_price", "grid_levels", "order_size"}
-    missing = required.difference(data)
-    if missing:
-        raise ValueError(f"config.yaml missing values: {', '.join(missing)}")
-    return data
+
+def _round_price(price: float) -> float:
+    """Return ``round(price, 10)`` computed with float arithmetic only, so numba compiles it unchanged.
+
+    numba's own ``round(x, 10)`` scales, rounds and divides, which disagrees with CPython whenever the
+    scaled product lands on the wrong side of a half; the exact product is tracked here instead.
+    """
+    # From 2**19 up doubles are spaced wider than 1e-10, so rounding to 10 decimals is a no-op.
+    if not abs(price) < 524288.0:
+        return price
+    scaled = price * 1e10
+    # Veltkamp split: 1e10 has 24 significant bits, so both half-products are exact and
+    # scaled + error == price * 1e10 exactly (Dekker's two-product).
+    t = price * 134217729.0
+    high = t - (t - price)
+    low = price - high
+    error = (high * 1e10 - scaled) + low * 1e10
+    whole = np.rint(scaled)
+    frac = scaled - whole
+    # rint already rounds ``scaled`` half to even; only ties of ``scaled`` or of the exact product need ``error``.
+    if frac == 0.5 and error > 0.0:
+        whole += 1.0
+    elif frac == -0.5 and error < 0.0:
+        whole -= 1.0
+    elif frac == 0.0 and abs(error) == 0.5 and whole % 2.0 != 0.0:
+        whole += math.copysign(1.0, error)
+    return whole / 1e10
+
+
+# Both scans rotate prices through this one function, so their fill logs cannot drift apart.
+round_price = njit(cache=True)(_round_price) if njit is not None else _round_price
 
 
 def load_history_csv(symbol: str, timeframe: str = "5m") -> pd.DataFrame:
@@ -41,24 +72,132 @@ def load_history_csv(symbol: str, timeframe: str = "5m") -> pd.DataFrame:
     return df
 
 
-def build_initial_orders(symbol: str, levels: List[float], start_price: float) -> List[Dict[str, object]]:
-    orders: List[Dict[str, object]] = []
-    for level in levels:
-        if math.isclose(level, start_price):
+def build_initial_orders(levels: List[float], start_price: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return parallel (prices, side codes) arrays for the opening grid."""
+    prices = [level for level in levels if not math.isclose(level, start_price)]
+    sides = [BUY if level < start_price else SELL for level in prices]
+    return np.array(prices, dtype=np.float64), np.array(sides, dtype=np.int8)
+
+
+def book_bounds(prices: np.ndarray, sides: np.ndarray) -> Tuple[float, float]:
+    """Return (highest buy, lowest sell); a bar can only fill if its low or high reaches one of them."""
+    buys = prices[sides == BUY]
+    sells = prices[sides == SELL]
+    return (
+        float(buys.max()) if buys.size else -math.inf,
+        float(sells.min()) if sells.size else math.inf,
+    )
+
+
+def scan_fills_numpy(
+    lows: np.ndarray, highs: np.ndarray, prices: np.ndarray, sides: np.ndarray, grid_step: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Replay the grid over all bars and return the fill log as (bar index, price, side code) arrays."""
+    fill_bars: List[int] = []
+    fill_prices: List[float] = []
+    fill_sides: List[int] = []
+    buy_top, sell_floor = book_bounds(prices, sides)
+    for i, (low, high) in enumerate(zip(lows.tolist(), highs.tolist())):
+        # Most bars stay inside the spread; skip them without building a mask.
+        if not (low <= buy_top or high >= sell_floor):
+            continue
+        # Orders rotated on this bar only become eligible from the next bar on.
+        filled = np.where(sides == BUY, low <= prices, high >= prices)
+        fill_idx = np.flatnonzero(filled)
+        if fill_idx.size == 0:
+            continue
+
+        filled_prices = prices[fill_idx].tolist()
+        filled_sides = sides[fill_idx]
+        codes = filled_sides.tolist()
+        new_prices = np.array(
+            [round_price(level + STEP_SIGN[code] * grid_step) for level, code in zip(filled_prices, codes)],
+            dtype=np.float64,
+        )
+        new_sides = filled_sides ^ 1
+        fill_bars.extend([i] * len(codes))
+        fill_prices.extend(filled_prices)
+        fill_sides.extend(codes)
+
+        # Filled orders leave their slot and the rotated ones join at the end of the book.
+        keep = ~filled
+        prices = np.concatenate((prices[keep], new_prices))
+        sides = np.concatenate((sides[keep], new_sides))
+        buy_top, sell_floor = book_bounds(prices, sides)
+
+    return (
+        np.array(fill_bars, dtype=np.int64),
+        np.array(fill_prices, dtype=np.float64),
+        np.array(fill_sides, dtype=np.int8),
+    )
+
+
+def _scan_fills_kernel(lows, highs, prices, sides, grid_step):
+    """Loop form of scan_fills_numpy written for numba's nopython mode."""
+    n_orders = prices.shape[0]
+    prices = prices.copy()
+    sides = sides.copy()
+    new_prices = np.empty(n_orders, dtype=np.float64)
+    new_sides = np.empty(n_orders, dtype=np.int8)
+    capacity = max(16, 4 * n_orders)
+    fill_bars = np.empty(capacity, dtype=np.int64)
+    fill_prices = np.empty(capacity, dtype=np.float64)
+    fill_sides = np.empty(capacity, dtype=np.int8)
+    count = 0
+    buy_top = -np.inf
+    sell_floor = np.inf
+    for j in range(n_orders):
+        if sides[j] == BUY:
+            buy_top = max(buy_top, prices[j])
+        else:
+            sell_floor = min(sell_floor, prices[j])
+    for i in range(lows.shape[0]):
+        low = lows[i]
+        high = highs[i]
+        if not (low <= buy_top or high >= sell_floor):
             continue
-        side = "buy" if level < start_price else "sell"
-        orders.append({"symbol": symbol, "side": side, "price": level})
-    return orders
+        kept = 0
+        rotated = 0
+        for j in range(n_orders):
+            level = prices[j]
+            side = sides[j]
+            if (side == BUY and low <= level) or (side == SELL and high >= level):
+                if count == capacity:
+                    capacity *= 2
+                    fill_bars = np.concatenate((fill_bars, np.empty(count, dtype=np.int64)))
+                    fill_prices = np.concatenate((fill_prices, np.empty(count, dtype=np.float64)))
+                    fill_sides = np.concatenate((fill_sides, np.empty(count, dtype=np.int8)))
+                fill_bars[count] = i
+                fill_prices[count] = level
+                fill_sides[count] = side
+                count += 1
+                new_prices[rotated] = round_price(level + (1 - 2 * side) * grid_step)
+                new_sides[rotated] = side ^ 1
+                rotated += 1
+            else:
+                # Compact open orders in place; kept <= j so unread slots are never overwritten.
+                prices[kept] = level
+                sides[kept] = side
+                kept += 1
+        for k in range(rotated):
+            prices[kept + k] = new_prices[k]
+            sides[kept + k] = new_sides[k]
+        if rotated:
+            buy_top = -np.inf
+            sell_floor = np.inf
+            for j in range(n_orders):
+                if sides[j] == BUY:
+                    buy_top = max(buy_top, prices[j])
+                else:
+                    sell_floor = min(sell_floor, prices[j])
+    return fill_bars[:count], fill_prices[:count], fill_sides[:count]
 
 
-def rotate_order(side: str, level: float, grid_step: float) -> Tuple[str, float]:
-    if side == "buy":
-        return "sell", round(level + grid_step, 10)
-    return "buy", round(level - grid_step, 10)
+scan_fills_jit = njit(cache=True)(_scan_fills_kernel) if njit is not None else None
 
 
 def run_backtest(timeframe: str = "5m") -> None:
-    config = load_config()
+    config = load_config(CONFIG_FILE)
     symbol = config["symbol"]
     order_size = float(config["order_size"])
     grid_levels = int(config["grid_levels"])
@@ -73,7 +212,7 @@ def run_backtest(timeframe: str = "5m") -> None:
     calculator = GridCalculator(lower_price, upper_price, grid_levels)
     levels = calculator.calculate_levels()
     grid_step = levels[1] - levels[0] if len(levels) > 1 else 0.0
-    orders = build_initial_orders(symbol, levels, start_price)
+    prices, sides = build_initial_orders(levels, start_price)
 
     balance_usdt = 1000.0
     balance_coin = 0.0
@@ -82,43 +221,37 @@ def run_backtest(timeframe: str = "5m") -> None:
     fees_paid = 0.0
     trades: List[Dict[str, object]] = []
 
-    for _, row in df.iterrows():
-        low = float(row["low"])
-        high = float(row["high"])
-        ts = int(row["timestamp"])
-        for order in orders[:]:
-            level = float(order["price"])
-            side = order["side"]
-            filled = (side == "buy" and low <= level) or (side == "sell" and high >= level)
-            if not filled:
-                continue
-
-            value = level * order_size
-            fee = value * fee_rate
-            fees_paid += fee
-
-            if side == "buy":
-                balance_usdt -= value
-                balance_coin += order_size
-            else:
-                balance_usdt += value
-                balance_coin -= order_size
-
-            opposite_side, new_price = rotate_order(side, level, grid_step)
-            orders.remove(order)
-            orders.append({"symbol": symbol, "side": opposite_side, "price": new_price})
-
-            trades.append(
-                {
-                    "timestamp": ts,
-                    "side": side,
-                    "price": level,
-                    "amount": order_size,
-                    "fee": fee,
-                }
-            )
-
-            grid_profit += value if side == "sell" else -value
+    lows = df["low"].to_numpy(dtype=np.float64)
+    highs = df["high"].to_numpy(dtype=np.float64)
+    timestamps = df["timestamp"].to_numpy(dtype=np.int64)
+
+    scan_fills = scan_fills_jit if scan_fills_jit is not None else scan_fills_numpy
+    fill_bars, fill_prices, fill_sides = scan_fills(lows, highs, prices, sides, grid_step)
+
+    for bar, level, code in zip(fill_bars.tolist(), fill_prices.tolist(), fill_sides.tolist()):
+        side = SIDE_NAMES[code]
+        value = level * order_size
+        fee = value * fee_rate
+        fees_paid += fee
+
+        if side == "buy":
+            balance_usdt -= value
+            balance_coin += order_size
+        else:
+            balance_usdt += value
+            balance_coin -= order_size
+
+        trades.append(
+            {
+                "timestamp": int(timestamps[bar]),
+                "side": side,
+                "price": level,
+                "amount": order_size,
+                "fee": fee,
+            }
+        )
+
+        grid_profit += value if side == "sell" else -value
 
     end_portfolio_value = balance_usdt + balance_coin * end_price
     start_portfolio_value = 1000.0
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+
+CONFIG_FILE = Path(__file__).with_name("config.yaml")
+
+# Marks schema entries that must be present in the YAML file.
+REQUIRED = object()
+
+Schema = Tuple[Tuple[str, Callable[[Any], Any], Any], ...]
+
+
+def parse_bool(value: Any) -> bool:
+    """Caster for boolean settings: YAML booleans or the strings "true"/"false"; anything else is rejected.
+
+    ``bool`` itself is not a usable caster, since any non-empty string such as "false" is truthy.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "false"):
+            return lowered == "true"
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+# (key, caster, default) entries for the grid strategy settings shared by the bot and backtests.
+GRID_SCHEMA: Schema = (
+    ("symbol", str, REQUIRED),
+    ("lower_price", float, REQUIRED),
+    ("upper_price", float, REQUIRED),
+    ("grid_levels", int, REQUIRED),
+    ("order_size", float, REQUIRED),
+)
+
+# Validated configs keyed by (resolved path, mtime_ns, size, schema); a changed file gets a new key.
+_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+
+def clear_cache() -> None:
+    """Forget all memoized configs so the next load re-reads YAML from disk."""
+    _CACHE.clear()
+
+
+def _sidecar_path(path: Path) -> Path:
+    return path.with_name(f".{path.stem}.cache.json")
+
+
+def _read_sidecar(path: Path, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+    """Return the parsed mapping stored next to ``path`` if it was written for this exact file version."""
+    try:
+        with _sidecar_path(path).open(encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("mtime_ns") != stat.st_mtime_ns or payload.get("size") != stat.st_size:
+        return None
+    data = payload.get("data")
+    return data if isinstance(data, dict) else None
+
+
+def _write_sidecar(path: Path, stat: os.stat_result, data: Dict[str, Any]) -> None:
+    """Store the parsed YAML as JSON; skipped for read-only dirs or values JSON cannot represent exactly."""
+    try:
+        # Non-str keys, dates and the like would come back changed and make a warm start differ from a cold one.
+        if json.loads(json.dumps(data)) != data:
+            return
+    except (TypeError, ValueError):
+        return
+    target = _sidecar_path(path)
+    try:
+        fd, tmp_name = tempfile.mkstemp(prefix=target.name, suffix=".tmp", dir=target.parent)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "data": data}, handle)
+        os.replace(tmp_name, target)
+    except OSError:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+
+
+def load_config(path: Path = CONFIG_FILE, schema: Schema = GRID_SCHEMA) -> Dict[str, Any]:
+    """Read a YAML mapping, enforce required keys and coerce values according to ``schema``."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"{path} is missing")
+
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size, schema)
+    cached = _CACHE.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    # A fresh process reuses the JSON sidecar instead of re-parsing YAML while the file is unchanged.
+    data = _read_sidecar(path, stat)
+    if data is None:
+        with path.open(encoding="utf-8") as handle:
+            data = yaml.load(handle, Loader=_YamlLoader)
+
+        if not isinstance(data, dict):
+            raise ValueError(f"{path.name} must contain a mapping at the root level")
+        _write_sidecar(path, stat, data)
+
+    missing = [name for name, _cast, default in schema if default is REQUIRED and name not in data]
+    if missing:
+        raise ValueError(f"{path.name} missing required keys: {', '.join(sorted(missing))}")
+
+    for name, cast, default in schema:
+        if name not in data:
+            data[name] = default
+            continue
+        try:
+            data[name] = cast(data[name])
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"{path.name}: invalid value for {name!r}: {data[name]!r}") from exc
+
+    _CACHE[key] = data
+    return dict(data)
@@ -5,24 +5,17 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 import ccxt
-import yaml
 from dotenv import load_dotenv
 
+from config_loader import REQUIRED, load_config
+from http_session import build_http_session
+
 
 ROOT_DIR = Path(__file__).resolve().parent
 if not (ROOT_DIR / "config.yaml").exists():
     ROOT_DIR = ROOT_DIR.parent
 CONFIG_FILE = ROOT_DIR / "config.yaml"
-
-
-def load_config(path: Path = CONFIG_FILE) -> dict[str, object]:
-    with open(path, encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
-    if not isinstance(data, dict):
-        raise ValueError("config.yaml must map keys to values")
-    if "symbol" not in data:
-        raise ValueError("config.yaml must define a symbol")
-    return data
+SCHEMA = (("symbol", str, REQUIRED),)
 
 
 def init_exchange() -> ccxt.Exchange:
@@ -37,11 +30,11 @@ def init_exchange() -> ccxt.Exchange:
             "secret": api_secret,
             "password": passphrase,
         }
-    return ccxt.kucoin({**credentials, "enableRateLimit": True})
+    return ccxt.kucoin({**credentials, "enableRateLimit": True, "session": build_http_session()})
 
 
 def fetch_history() -> None:
-    config = load_config()
+    config = load_config(CONFIG_FILE, SCHEMA)
     symbol = config["symbol"]
     timeframe = "5m"
     start_dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
@@ -2,39 +2,29 @@ from pathlib import Path
 from typing import Any, Dict
 
 import ccxt
-import yaml
+
+from config_loader import REQUIRED, load_config as shared_load_config, parse_bool
 
 
 CONFIG_FILE = Path(__file__).with_name("config.yaml")
+SCHEMA = (
+    ("pair", str, REQUIRED),
+    ("exchange", str, REQUIRED),
+    ("grid_levels", int, REQUIRED),
+    ("lower_price", float, REQUIRED),
+    ("upper_price", float, REQUIRED),
+    ("amount_per_grid", float, REQUIRED),
+    ("testnet", parse_bool, False),
+)
 
 
 def load_config(path: Path = CONFIG_FILE) -> Dict[str, Any]:
     """Read YAML configuration and enforce required values."""
-    if not path.exists():
-        raise FileNotFoundError(f"{path} missing")
-
-    parsed = yaml.safe_load(path.read_text())
-    if not isinstance(parsed, dict):
-        raise ValueError("config.yaml must contain a mapping at the root")
-
-    required = ["pair", "exchange", "grid_levels", "lower_price", "upper_price", "amount_per_grid"]
-    missing = [key for key in required if key not in parsed]
-    if missing:
-        raise ValueError(f"config missing: {', '.join(missing)}")
-
-    lower = float(parsed["lower_price"])
-    upper = float(parsed["upper_price"])
-    if lower >= upper:
+    parsed = shared_load_config(path, SCHEMA)
+    if parsed["lower_price"] >= parsed["upper_price"]:
         raise ValueError("lower_price must be less than upper_price")
-    levels = int(parsed["grid_levels"])
-    if levels <= 0:
+    if parsed["grid_levels"] <= 0:
         raise ValueError("grid_levels must be a positive integer")
-
-    parsed["lower_price"] = lower
-    parsed["upper_price"] = upper
-    parsed["grid_levels"] = levels
-    parsed["amount_per_grid"] = float(parsed["amount_per_grid"])
-    parsed.setdefault("testnet", False)
     return parsed
 
 
@@ -1,14 +1,49 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, TypeVar
 
 
-@dataclass
+Number = TypeVar("Number")
+
+
+def grid_step_pct(lower_price: Number, upper_price: Number, grid_levels: Number, price: Number) -> Number:
+    """Return the arithmetic grid step as a percentage of ``price``.
+
+    Uses plain arithmetic only, so NumPy arrays of bounds, level counts or prices
+    broadcast through it and a whole parameter sweep is evaluated in one call.
+    """
+    return (upper_price - lower_price) / grid_levels / price * 100.0
+
+
+class BreakEvenSolver:
+    """Recommend level counts whose step stays above a minimum profit per grid.
+
+    Range-dependent terms are computed once, so sweeping thresholds or prices
+    for the same bounds costs a single division per call.
+    """
+
+    __slots__ = ("_span_pct",)
+
+    def __init__(self, lower_price: float, upper_price: float) -> None:
+        if lower_price <= 0 or upper_price <= lower_price:
+            raise ValueError("expected 0 < lower_price < upper_price")
+        self._span_pct = (upper_price - lower_price) * 100.0
+
+    def arithmetic_levels(self, min_step_pct: float, price: float) -> int:
+        """Return the largest evenly spaced level count with a step of at least ``min_step_pct`` of ``price``."""
+        return max(int(self._span_pct / (price * min_step_pct)), 1)
+
+
+@dataclass(slots=True)
 class GridCalculator:
     """Calculate evenly spaced price levels for a grid strategy."""
 
     lower_price: float
     upper_price: float
     grid_levels: int
+    step: float = field(init=False, repr=False)
+    _levels: Tuple[float, ...] = field(init=False, repr=False, compare=False)
+    # (filled side, price) -> (side, price) of the replacement order, for levels and one rotation off them.
+    next_order_plan: Dict[Tuple[str, float], Tuple[str, float]] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         if self.lower_price <= 0:
@@ -19,8 +54,28 @@ class GridCalculator:
             raise ValueError("grid_levels must be greater than 0")
         if self.upper_price <= self.lower_price:
             raise ValueError("upper_price must be greater than lower_price")
+        self.step = (self.upper_price - self.lower_price) / self.grid_levels
+        lower, step = self.lower_price, self.step
+        self._levels = tuple(round(lower + step * i, 10) for i in range(self.grid_levels + 1))
+        plan: Dict[Tuple[str, float], Tuple[str, float]] = {}
+        for level in self._levels:
+            for side in ("buy", "sell"):
+                rotated = self.next_order(side, level)
+                plan[(side, level)] = rotated
+                plan.setdefault(rotated, self.next_order(*rotated))
+        self.next_order_plan = plan
+
+    def next_order(self, side: str, price: float) -> Tuple[str, float]:
+        """Return the order that replaces a filled ``side`` order at ``price``: one step up or down, opposite side."""
+        if side == "buy":
+            return "sell", round(price + self.step, 10)
+        return "buy", round(price - self.step, 10)
+
+    @property
+    def levels(self) -> Tuple[float, ...]:
+        """Grid prices from lower_price to upper_price inclusive, computed once at construction."""
+        return self._levels
 
     def calculate_levels(self) -> List[float]:
         """Return arithmetic grid prices from lower_price to upper_price inclusive."""
-        step = (self.upper_price - self.lower_price) / self.grid_levels
-        return [round(self.lower_price + step * i, 10) for i in range(self.grid_levels + 1)]
+        return list(self._levels)
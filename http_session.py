@@ -0,0 +1,24 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_http_session() -> requests.Session:
+    """Return a keep-alive session with a pooled adapter for ccxt REST clients.
+
+    Connections (TLS included) are reused across calls, and urllib3 already sets TCP_NODELAY on them.
+    Failures while connecting are retried for every method, since nothing has reached the exchange yet.
+    Read errors and 5xx gateway responses are retried only for GET, so a POST that may have placed
+    an order is never replayed by the transport layer.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
@@ -1,76 +1,108 @@
+import asyncio
+import logging
 import os
+import queue
 import sqlite3
+import sys
 import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import ccxt
 from dotenv import load_dotenv
-import yaml
 
-from grid_logic import GridCalculator
+from config_loader import GRID_SCHEMA, Schema, load_config, parse_bool
+from grid_logic import BreakEvenSolver, GridCalculator, grid_step_pct
+from http_session import build_http_session
 
 
 DRY_RUN = True
 CONFIG_FILE = Path("config.yaml")
 DB_FILE = Path("grid_bot.db")
+POLL_INTERVAL = 10.0
+# Grid step (in % of price) needed to cover entry + exit exchange fees.
+MIN_STEP_PCT = 0.2
+BOT_SCHEMA: Schema = GRID_SCHEMA + (
+    ("use_websocket", parse_bool, False),
+    ("sqlite_wal", parse_bool, False),
+)
+
+logger = logging.getLogger(__name__)
+
+_DOTENV_LOADED = False
+
+
+def _ensure_dotenv() -> None:
+    """Parse .env on first use only; reconnects reuse the already populated environment."""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        load_dotenv()
+        _DOTENV_LOADED = True
 
 
 class GridBot:
     """Grid trading bot with SQLite persistence for orders and trade history."""
 
+    # Bump together with a migration step in _init_db whenever the tables change.
+    SCHEMA_VERSION = 1
+    # Statement texts are shared by every call site so sqlite3's statement cache always hits.
+    _SQL_SELECT_OPEN_ORDERS = (
+        "SELECT id, symbol, price, side, status, timestamp FROM active_orders WHERE status = 'open'"
+    )
+    _SQL_INSERT_ORDER = (
+        "INSERT OR REPLACE INTO active_orders (id, symbol, price, side, status, timestamp) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+    _SQL_DELETE_ORDER = "DELETE FROM active_orders WHERE id = ?"
+    _SQL_INSERT_TRADE = (
+        "INSERT INTO trades_history (timestamp, symbol, side, price, amount, value, fee_estimated) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)"
+    )
+
     def __init__(
         self,
         config_path: Path = CONFIG_FILE,
         db_path: Path = DB_FILE,
         dry_run: bool = DRY_RUN,
+        price_source: Optional[Callable[[], Optional[float]]] = None,
     ) -> None:
         self.dry_run = dry_run
+        # Replaces the REST ticker in fetch_current_price, e.g. to replay recorded prices in a dry run.
+        self._price_source = price_source
         self.config = self.load_config(config_path)
-        self.symbol = str(self.config["symbol"])
+        self.symbol = sys.intern(str(self.config["symbol"]))
         self.order_size = float(self.config["order_size"])
+        self.use_websocket = self.config["use_websocket"]
 
         self.exchange = self.init_exchange()
+        self.exchange_id = sys.intern(str(getattr(self.exchange, "id", "exchange")))
         self.calculator = GridCalculator(
             lower_price=float(self.config["lower_price"]),
             upper_price=float(self.config["upper_price"]),
             grid_levels=int(self.config["grid_levels"]),
         )
-        self.grid_step = (self.calculator.upper_price - self.calculator.lower_price) / self.calculator.grid_levels
+        self.grid_step = self.calculator.step
 
         self.db_path = Path(db_path)
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(self.db_path, cached_statements=256)
         self.conn.row_factory = sqlite3.Row
+        self._configure_db()
         self._init_db()
+        # The bot is the only writer of active_orders, so this copy mirrors the open rows and saves a
+        # SELECT per tick; None until the first load or save.
+        self._active_orders: Optional[List[Dict[str, Any]]] = None
 
     @staticmethod
     def load_config(path: Path = CONFIG_FILE) -> Dict[str, Any]:
         """Load strategy settings required for the grid calculator."""
-        if not path.exists():
-            raise FileNotFoundError(f"{path} is missing")
-
-        with path.open(encoding="utf-8") as handle:
-            data = yaml.safe_load(handle)
-
-        if not isinstance(data, dict):
-            raise ValueError("config.yaml must contain a mapping at the root level")
-
-        required = {"symbol", "lower_price", "upper_price", "grid_levels", "order_size"}
-        missing = required.difference(data)
-        if missing:
-            raise ValueError(f"config.yaml missing required keys: {', '.join(sorted(missing))}")
-
-        data["lower_price"] = float(data["lower_price"])
-        data["upper_price"] = float(data["upper_price"])
-        data["grid_levels"] = int(data["grid_levels"])
-        data["order_size"] = float(data["order_size"])
-        return data
+        return load_config(path, BOT_SCHEMA)
 
     @staticmethod
-    def init_exchange() -> ccxt.Exchange:
-        """Configure the ccxt KuCoin client using environment credentials."""
-        load_dotenv()
+    def credentials() -> Dict[str, str]:
+        """Return the KuCoin API credentials from the environment (or .env)."""
+        _ensure_dotenv()
         api_key = os.getenv("KUCOIN_API_KEY")
         api_secret = os.getenv("KUCOIN_API_SECRET")
         passphrase = os.getenv("KUCOIN_PASSPHRASE")
@@ -78,19 +110,66 @@ class GridBot:
             raise EnvironmentError(
                 "KUCOIN_API_KEY, KUCOIN_API_SECRET and KUCOIN_PASSPHRASE must be set in the environment"
             )
+        return {"apiKey": api_key, "secret": api_secret, "password": passphrase}
 
+    @staticmethod
+    def init_exchange() -> ccxt.Exchange:
+        """Configure the ccxt KuCoin client using environment credentials."""
         return ccxt.kucoin(
             {
-                "apiKey": api_key,
-                "secret": api_secret,
-                "password": passphrase,
+                **GridBot.credentials(),
                 "enableRateLimit": True,
+                "session": build_http_session(),
             }
         )
 
+    @staticmethod
+    def init_async_exchange() -> Any:
+        """Create an authenticated async ccxt.pro KuCoin client for concurrent order submission."""
+        import ccxt.pro
+
+        return ccxt.pro.kucoin({**GridBot.credentials(), "enableRateLimit": True})
+
+    @staticmethod
+    def init_stream_exchange() -> Any:
+        """Create the async ccxt.pro KuCoin client used only for the public ticker stream."""
+        import ccxt.pro
+
+        return ccxt.pro.kucoin({"enableRateLimit": True})
+
+    def _configure_db(self) -> None:
+        """Tune SQLite for frequent small commits.
+
+        Live runs switch to a WAL journal with relaxed fsync only when ``sqlite_wal`` is enabled in the
+        config; otherwise they keep the default rollback journal with full fsync.
+        Dry runs only hold simulated orders, so their journal stays in memory and commits skip fsync.
+        """
+        if self.dry_run:
+            journal_mode, synchronous = "MEMORY", "OFF"
+        elif self.config["sqlite_wal"]:
+            journal_mode, synchronous = "WAL", "NORMAL"
+        else:
+            journal_mode, synchronous = "DELETE", "FULL"
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+
     def _init_db(self) -> None:
-        """Create tables for active orders and trade history if needed."""
+        """Create tables for active orders and trade history if needed.
+
+        The schema revision is kept in ``PRAGMA user_version``; a database already at
+        ``SCHEMA_VERSION`` skips the DDL entirely.
+        """
+        (version,) = self.conn.execute("PRAGMA user_version").fetchone()
+        if version >= self.SCHEMA_VERSION:
+            return
         with self.conn:
+            # sqlite3 only opens implicit transactions for DML, so without this each DDL statement would
+            # commit on its own and an interrupted migration could leave user_version behind the tables.
+            self.conn.execute("BEGIN")
             self.conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS active_orders (
@@ -117,56 +196,69 @@ class GridBot:
                 )
                 """
             )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_active_orders_status ON active_orders(status)")
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
 
     def load_active_orders(self) -> List[Dict[str, Any]]:
-        """Load currently active grid orders from SQLite."""
-        cursor = self.conn.execute(
-            "SELECT id, symbol, price, side, status, timestamp FROM active_orders WHERE status = 'open'"
-        )
-        orders: List[Dict[str, Any]] = []
-        for row in cursor.fetchall():
-            orders.append(
-                {
-                    "id": row["id"],
-                    "symbol": row["symbol"],
-                    "price": float(row["price"]),
-                    "side": row["side"],
-                    "amount": self.order_size,
-                    "exchange": getattr(self.exchange, "id", "exchange"),
-                    "status": row["status"],
-                    "timestamp": row["timestamp"],
-                }
-            )
+        """Load currently active grid orders from SQLite with sides normalized to interned "buy"/"sell"."""
+        # Plain tuple rows: this query is on the hot path and its column order is fixed.
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(self._SQL_SELECT_OPEN_ORDERS)
+        order_size = self.order_size
+        exchange_id = self.exchange_id
+        orders: List[Dict[str, Any]] = [
+            {
+                "id": order_id,
+                "symbol": symbol,
+                "price": float(price),
+                "side": sys.intern(side.lower()),
+                "amount": order_size,
+                "exchange": exchange_id,
+                "status": status,
+                "timestamp": timestamp,
+            }
+            for order_id, symbol, price, side, status, timestamp in cursor
+        ]
+        self._active_orders = orders[:]
         return orders
 
+    @staticmethod
+    def _order_row(order: Dict[str, Any], default_ts: str) -> Tuple[Any, ...]:
+        """Return the active_orders column values for ``order``."""
+        return (
+            order["id"],
+            order["symbol"],
+            float(order["price"]),
+            order["side"],
+            order.get("status", "open"),
+            order.get("timestamp", default_ts),
+        )
+
+    @staticmethod
+    def _open_rows(orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return what load_active_orders would read back after ``orders`` were written.
+
+        INSERT OR REPLACE keeps only the last order per id, at the position of that last write,
+        and the SELECT skips rows whose status is not open.
+        """
+        latest = {order["id"]: order for order in orders}
+        return [order for order in orders if latest[order["id"]] is order and order.get("status", "open") == "open"]
+
     def save_active_orders(self, orders: List[Dict[str, Any]]) -> None:
         """Persist the snapshot of active orders to SQLite."""
+        now_ts = datetime.utcnow().isoformat()
+        rows = [self._order_row(order, now_ts) for order in orders]
         with self.conn:
             self.conn.execute("DELETE FROM active_orders")
-            for order in orders:
-                self.conn.execute(
-                    """
-                    INSERT OR REPLACE INTO active_orders (id, symbol, price, side, status, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        order["id"],
-                        order["symbol"],
-                        float(order["price"]),
-                        order["side"],
-                        order.get("status", "open"),
-                        order.get("timestamp", datetime.utcnow().isoformat()),
-                    ),
-                )
+            self.conn.executemany(self._SQL_INSERT_ORDER, rows)
+        self._active_orders = self._open_rows(orders)
 
     def log_trade(self, trade_data: Dict[str, Any]) -> None:
         """Insert executed trade data into trade history."""
         with self.conn:
             self.conn.execute(
-                """
-                INSERT INTO trades_history (timestamp, symbol, side, price, amount, value, fee_estimated)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
+                self._SQL_INSERT_TRADE,
                 (
                     trade_data["timestamp"],
                     trade_data["symbol"],
@@ -177,19 +269,57 @@ class GridBot:
                     float(trade_data["fee_estimated"]),
                 ),
             )
-        print(
-            f"[ACCOUNTING] zapisano transakcje: {trade_data['side']} {trade_data['amount']} "
-            f"{trade_data['symbol']} po {trade_data['price']}"
+        logger.info(
+            "[ACCOUNTING] zapisano transakcje: %s %s %s po %s",
+            trade_data["side"],
+            trade_data["amount"],
+            trade_data["symbol"],
+            trade_data["price"],
         )
 
-    def create_limit_order(self, side: str, price: float, amount: float) -> Optional[Dict[str, Any]]:
-        """Place a limit order (real or simulated) and return stored representation."""
-        now_ts = datetime.utcnow().isoformat()
-        exchange_id = getattr(self.exchange, "id", "exchange")
+    def _stored_order(
+        self, order: Dict[str, Any], side: str, price: float, amount: float, now_ts: str
+    ) -> Optional[Dict[str, Any]]:
+        """Convert an exchange order response into the stored representation."""
+        order_id = order.get("id") or order.get("orderId")
+        if not order_id:
+            logger.error("[ERROR] Brak ID zlecenia dla %s %s@%s", side, amount, price)
+            return None
+
+        raw_ts = order.get("timestamp")
+        order_timestamp: str
+        if isinstance(raw_ts, (int, float)):
+            order_timestamp = datetime.utcfromtimestamp(raw_ts / 1000).isoformat()
+        else:
+            order_timestamp = str(order.get("datetime") or now_ts)
+
+        status = order.get("status") or "open"
+        logger.info("[LIVE] Zlozono zlecenie %s: %s %s %s @ %s", order_id, side, amount, self.symbol, price)
+        return {
+            "id": str(order_id),
+            "symbol": self.symbol,
+            "side": side,
+            "price": price,
+            "amount": amount,
+            "exchange": self.exchange_id,
+            "status": status,
+            "timestamp": order_timestamp,
+        }
+
+    def create_limit_order(
+        self, side: str, price: float, amount: float, now_ts: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Place a limit order (real or simulated) and return stored representation.
+
+        Batch callers pass their own ``now_ts`` so every order of the batch shares one timestamp.
+        """
+        if now_ts is None:
+            now_ts = datetime.utcnow().isoformat()
+        exchange_id = self.exchange_id
 
         if self.dry_run:
             order_id = f"sim_{self.symbol}_{price}"
-            print(f"[DRY RUN] plan zlecenia {side} {amount} {self.symbol} po cenie {price}")
+            logger.info("[DRY RUN] plan zlecenia %s %s %s po cenie %s", side, amount, self.symbol, price)
             return {
                 "id": order_id,
                 "symbol": self.symbol,
@@ -205,96 +335,136 @@ class GridBot:
         while attempts < 2:
             try:
                 order = self.exchange.create_order(self.symbol, "limit", side, amount, price)
-                order_id = order.get("id") or order.get("orderId")
-                if not order_id:
-                    print(f"[ERROR] Brak ID zlecenia dla {side} {amount}@{price}")
-                    return None
-
-                raw_ts = order.get("timestamp")
-                order_timestamp: str
-                if isinstance(raw_ts, (int, float)):
-                    order_timestamp = datetime.utcfromtimestamp(raw_ts / 1000).isoformat()
-                else:
-                    order_timestamp = str(order.get("datetime") or now_ts)
-
-                status = order.get("status") or "open"
-                print(f"[LIVE] Zlozono zlecenie {order_id}: {side} {amount} {self.symbol} @ {price}")
-                return {
-                    "id": str(order_id),
-                    "symbol": self.symbol,
-                    "side": side,
-                    "price": price,
-                    "amount": amount,
-                    "exchange": exchange_id,
-                    "status": status,
-                    "timestamp": order_timestamp,
-                }
+                return self._stored_order(order, side, price, amount, now_ts)
             except ccxt.InsufficientFunds as exc:
-                print(f"[CRITICAL] Brak srodkow dla zlecenia {side} {amount}@{price}: {exc}")
+                logger.critical("[CRITICAL] Brak srodkow dla zlecenia %s %s@%s: %s", side, amount, price, exc)
                 return None
             except ccxt.NetworkError as exc:
                 attempts += 1
-                print(f"[WARN] Problem sieci podczas skladania zlecenia {side} {amount}@{price}: {exc}")
+                logger.warning("[WARN] Problem sieci podczas skladania zlecenia %s %s@%s: %s", side, amount, price, exc)
                 time.sleep(1)
                 if attempts >= 2:
                     return None
             except Exception as exc:  # pragma: no cover
-                print(f"[ERROR] Nie udalo sie zlozyc zlecenia {side} {amount}@{price}: {exc}")
+                logger.error("[ERROR] Nie udalo sie zlozyc zlecenia %s %s@%s: %s", side, amount, price, exc)
                 return None
 
         return None
 
     def place_initial_grid(self, current_price: float) -> List[Dict[str, Any]]:
-        """Simulate placing the initial grid and return the order plan."""
+        """Place the opening grid (simulated in dry run) and return the stored orders."""
+        plan = [
+            ("buy" if level < current_price else "sell", level)
+            for level in self.calculator.calculate_levels()
+            if level != current_price
+        ]
+        orders: List[Dict[str, Any]] = []
+        if self.dry_run:
+            now_ts = datetime.utcnow().isoformat()
+            for side, level in plan:
+                created = self.create_limit_order(side, level, self.order_size, now_ts)
+                if created:
+                    orders.append(created)
+        else:
+            orders = asyncio.run(self._submit_orders(plan))
+        if orders:
+            self.save_active_orders(orders)
+            logger.info("Siatka zainicjowana. Zapisano %s zlecen", len(orders))
+        return orders
+
+    async def _submit_orders(self, plan: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        """
+        Submit all planned limit orders concurrently over one async client.
+
+        Orders that hit a network error are retried through the blocking create_limit_order path;
+        insufficient funds and other rejections are reported and skipped, as in create_limit_order.
+        """
+        client = self.init_async_exchange()
+        try:
+            results = await asyncio.gather(
+                *(client.create_order(self.symbol, "limit", side, self.order_size, price) for side, price in plan),
+                return_exceptions=True,
+            )
+        finally:
+            await client.close()
+
+        now_ts = datetime.utcnow().isoformat()
         orders: List[Dict[str, Any]] = []
-        for level in self.calculator.calculate_levels():
-            if level == current_price:
+        for (side, price), result in zip(plan, results):
+            amount = self.order_size
+            if isinstance(result, ccxt.InsufficientFunds):
+                logger.critical("[CRITICAL] Brak srodkow dla zlecenia %s %s@%s: %s", side, amount, price, result)
                 continue
-            side = "buy" if level < current_price else "sell"
-            created = self.create_limit_order(side, level, self.order_size)
+            if isinstance(result, ccxt.NetworkError):
+                logger.warning(
+                    "[WARN] Problem sieci podczas skladania zlecenia %s %s@%s: %s", side, amount, price, result
+                )
+                created = self.create_limit_order(side, price, amount, now_ts)
+            elif isinstance(result, Exception):
+                logger.error("[ERROR] Nie udalo sie zlozyc zlecenia %s %s@%s: %s", side, amount, price, result)
+                continue
+            else:
+                created = self._stored_order(result, side, price, amount, now_ts)
             if created:
                 orders.append(created)
-        if orders:
-            self.save_active_orders(orders)
-            print(f"Siatka zainicjowana. Zapisano {len(orders)} zlecen")
         return orders
 
+    @staticmethod
+    def is_crossed(order: Dict[str, Any], price: float) -> bool:
+        """Return True when ``price`` has reached the order's limit price on its fill side."""
+        order_price = float(order["price"])
+        if order["side"] == "buy":
+            return price <= order_price
+        return price >= order_price
+
+    def fetch_open_order_ids(self) -> Optional[Set[str]]:
+        """Return ids of all open orders for the symbol in one request, or None if it failed."""
+        try:
+            return {str(order["id"]) for order in self.exchange.fetch_open_orders(self.symbol)}
+        except Exception as exc:
+            logger.warning("[WARN] Nie udalo sie pobrac listy otwartych zlecen: %s", exc)
+            return None
+
     def check_order_status(
         self,
         order: Dict[str, Any],
         current_price: Optional[float],
+        open_ids: Optional[Set[str]] = None,
     ) -> Tuple[str, Optional[float], float]:
         """
         Determine the status of an order.
 
+        ``open_ids`` is the exchange's open-order snapshot for this pass; orders listed there are
+        reported open without a request of their own.
+
         Returns (status, fill_price, filled_amount).
         """
-        side = order["side"].lower()
         if self.dry_run:
             if current_price is None:
                 return "open", None, 0.0
 
-            order_price = float(order["price"])
-            filled = (side == "buy" and current_price <= order_price) or (
-                side == "sell" and current_price >= order_price
-            )
-            if filled:
-                return "closed", order_price, float(order.get("amount", self.order_size))
+            if self.is_crossed(order, current_price):
+                return "closed", float(order["price"]), float(order.get("amount", self.order_size))
+            return "open", None, 0.0
+
+        if open_ids is not None and order["id"] in open_ids:
             return "open", None, 0.0
 
         try:
             order_info = self.exchange.fetch_order(order["id"], self.symbol)
         except ccxt.NetworkError as exc:
-            print(f"[WARN] Problem sieci podczas pobierania statusu {order['id']}: {exc}")
+            logger.warning("[WARN] Problem sieci podczas pobierania statusu %s: %s", order["id"], exc)
             time.sleep(1)
             return "open", None, 0.0
         except Exception as exc:  # pragma: no cover
-            print(f"[WARN] Nie udalo sie pobrac statusu zlecenia {order['id']}: {exc}")
+            logger.warning("[WARN] Nie udalo sie pobrac statusu zlecenia %s: %s", order["id"], exc)
             return "open", None, 0.0
 
         status = str(order_info.get("status") or "").lower()
         fill_price = order_info.get("average") or order_info.get("price")
-        filled_amount = float(order_info.get("filled") or order_info.get("amount") or order.get("amount", self.order_size))
+        filled_amount = float(
+            order_info.get("filled") or order_info.get("amount") or order.get("amount", self.order_size)
+        )
         try:
             fill_price = float(fill_price) if fill_price is not None else None
         except (TypeError, ValueError):
@@ -307,22 +477,36 @@ class GridBot:
         current_price: float,
     ) -> List[Dict[str, Any]]:
         """Check real fills via exchange (or simulate in dry-run) and flip executed orders."""
-        orders = self.load_active_orders()
+        orders = self._active_orders if self._active_orders is not None else self.load_active_orders()
         updated_orders = orders[:]
-        modified = False
+        open_ids: Optional[Set[str]] = None
+        if not self.dry_run and orders:
+            open_ids = self.fetch_open_order_ids()
+            if open_ids is None:
+                # Exchange unreachable: keep the book as is and retry on the next pass.
+                return updated_orders
+        # Only rows that changed are written, in one transaction after the scan.
+        removed_ids: List[Tuple[str]] = []
+        new_rows: List[Tuple[Any, ...]] = []
+        # One timestamp per pass: fills detected together are recorded together.
+        now_ts = datetime.utcnow().isoformat()
+        next_order_plan = self.calculator.next_order_plan
+
+        candidates = orders
+        if self.dry_run:
+            # Simulated orders only fill when crossed (see is_crossed); skip the status call for the rest.
+            if current_price is None:
+                candidates = []
+            else:
+                candidates = [order for order in orders if self.is_crossed(order, current_price)]
 
-        for order in orders:
-            status, fill_price, filled_amount = self.check_order_status(order, current_price)
+        for order in candidates:
+            status, fill_price, filled_amount = self.check_order_status(order, current_price, open_ids)
             if status == "open":
                 continue
             if status == "canceled":
-                try:
-                    with self.conn:
-                        self.conn.execute("DELETE FROM active_orders WHERE id = ?", (order["id"],))
-                    updated_orders.remove(order)
-                    modified = True
-                except Exception as exc:  # pragma: no cover
-                    print(f"[WARN] Nie udalo sie usunac anulowanego zlecenia {order['id']}: {exc}")
+                removed_ids.append((order["id"],))
+                updated_orders.remove(order)
                 continue
             if status != "closed":
                 continue
@@ -330,7 +514,7 @@ class GridBot:
             execution_price = fill_price if fill_price is not None else float(order["price"])
             trade_value = round(execution_price * filled_amount, 10)
             trade_data = {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now_ts,
                 "symbol": self.symbol,
                 "side": order["side"],
                 "price": execution_price,
@@ -340,50 +524,38 @@ class GridBot:
             }
             self.log_trade(trade_data)
 
-            opposite_side = "sell" if order["side"].lower() == "buy" else "buy"
-            new_price = round(order["price"] + self.grid_step, 10) if order["side"].lower() == "buy" else round(
-                order["price"] - self.grid_step, 10
-            )
+            key = (order["side"], order["price"])
+            opposite_side, new_price = next_order_plan.get(key) or self.calculator.next_order(*key)
 
-            new_order = self.create_limit_order(opposite_side, new_price, self.order_size)
+            new_order = self.create_limit_order(opposite_side, new_price, self.order_size, now_ts)
 
+            removed_ids.append((order["id"],))
+            updated_orders.remove(order)
+            if new_order:
+                updated_orders.append(new_order)
+                new_rows.append(self._order_row(new_order, now_ts))
+
+        if removed_ids or new_rows:
             try:
+                # Deletes go first so a replacement that reuses a filled order's id survives.
                 with self.conn:
-                    self.conn.execute("DELETE FROM active_orders WHERE id = ?", (order["id"],))
-                    if new_order:
-                        self.conn.execute(
-                            """
-                            INSERT OR REPLACE INTO active_orders (id, symbol, price, side, status, timestamp)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                new_order["id"],
-                                new_order["symbol"],
-                                float(new_order["price"]),
-                                new_order["side"],
-                                new_order.get("status", "open"),
-                                new_order.get("timestamp", datetime.utcnow().isoformat()),
-                            ),
-                        )
-                updated_orders.remove(order)
-                if new_order:
-                    updated_orders.append(new_order)
-                modified = True
+                    self.conn.executemany(self._SQL_DELETE_ORDER, removed_ids)
+                    self.conn.executemany(self._SQL_INSERT_ORDER, new_rows)
             except Exception as exc:  # pragma: no cover
-                print(f"[WARN] Blad podczas aktualizacji bazy dla zlecenia {order['id']}: {exc}")
-
-        if modified:
-            self.save_active_orders(updated_orders)
+                logger.warning("[WARN] Blad podczas aktualizacji bazy aktywnych zlecen: %s", exc)
+        self._active_orders = self._open_rows(updated_orders)
 
         return updated_orders
 
     def fetch_current_price(self) -> Optional[float]:
         """Fetch latest price for configured symbol."""
+        if self._price_source is not None:
+            return self._price_source()
         try:
             ticker = self.exchange.fetch_ticker(self.symbol)
             return ticker.get("last") or ticker.get("close")
         except Exception as exc:  # pragma: no cover
-            print(f"Blad podczas pobierania tickera: {exc}")
+            logger.warning("Blad podczas pobierania tickera: %s", exc)
             return None
 
     def risk_check(self, current_price: Optional[float]) -> None:
@@ -391,57 +563,133 @@ class GridBot:
         if current_price is None:
             return
 
-        grid_range = float(self.config["upper_price"]) - float(self.config["lower_price"])
-        profit_percent = (grid_range / int(self.config["grid_levels"])) / current_price
-        print(f"[INFO] Siatka: skok co {grid_range / int(self.config['grid_levels']):.2f} (~{profit_percent*100:.4f}%)")
-        if profit_percent < 0.002:
-            print("\n" + "!" * 50)
-            print(
-                f"CRITICAL WARNING: zysk na kratce to tylko {profit_percent*100:.4f}%!"
+        step_pct = grid_step_pct(
+            self.calculator.lower_price, self.calculator.upper_price, self.calculator.grid_levels, current_price
+        )
+        logger.info("[INFO] Siatka: skok co %.2f (~%.4f%%)", self.grid_step, step_pct)
+        if step_pct < MIN_STEP_PCT:
+            suggested = BreakEvenSolver(self.calculator.lower_price, self.calculator.upper_price).arithmetic_levels(
+                MIN_STEP_PCT, current_price
+            )
+            # One record for the whole banner so it is never interleaved with other output.
+            logger.warning(
+                "\n%s\nCRITICAL WARNING: zysk na kratce to tylko %.4f%%!\n"
+                "Gielda pobiera ok. 0.1%% - 0.2%% prowizji (entry + exit).\n"
+                "Sugerowane: zmniejsz liczbe grid_levels lub zwieksz zakres.\n"
+                "Dla obecnego zakresu: maksymalnie %s poziomow.\n%s\n",
+                "!" * 50,
+                step_pct,
+                suggested,
+                "!" * 50,
             )
-            print("Gielda pobiera ok. 0.1% - 0.2% prowizji (entry + exit).")
-            print("Sugerowane: zmniejsz liczbe grid_levels lub zwieksz zakres.")
-            print("!" * 50 + "\n")
             time.sleep(5)
 
     def run(self) -> None:
         """Start the bot loop: load state, fetch price, and monitor the grid."""
         try:
             balance = self.exchange.fetch_balance()
-            print("Balance fetched, exchange keys look valid.")
+            logger.info("Balance fetched, exchange keys look valid.")
         except Exception as exc:  # pragma: no cover
-            print(f"Unable to fetch balance: {exc}")
+            logger.warning("Unable to fetch balance: %s", exc)
 
         initial_price = self.fetch_current_price()
         self.risk_check(initial_price)
 
         active_orders = self.load_active_orders()
         if active_orders:
-            print(f"Zaladowano {len(active_orders)} aktywnych zlecen z bazy.")
+            logger.info("Zaladowano %s aktywnych zlecen z bazy.", len(active_orders))
         elif initial_price is not None:
             active_orders = self.place_initial_grid(initial_price)
         else:
-            print("Nie udalo sie zainicjowac siatki - brak ceny startowej.")
+            logger.error("Nie udalo sie zainicjowac siatki - brak ceny startowej.")
+            return
+
+        if self.use_websocket:
+            asyncio.run(self.stream_grid(active_orders))
             return
 
         while True:
+            started = time.monotonic()
             price = self.fetch_current_price()
             if price is not None:
                 active_orders = self.monitor_grid(price)
-                print(f"Bot dziala. Para: {self.symbol}, Cena: {price}")
-            time.sleep(10)
+                logger.info("Bot dziala. Para: %s, Cena: %s", self.symbol, price)
+            # Fixed cadence: time spent in the pass counts towards the interval.
+            time.sleep(max(0.0, POLL_INTERVAL - (time.monotonic() - started)))
+
+    async def stream_grid(self, active_orders: List[Dict[str, Any]]) -> None:
+        """
+        Drive monitor_grid from the websocket ticker instead of REST polling.
+
+        A pass runs as soon as a tick crosses an active order. Otherwise the grid is re-checked
+        every POLL_INTERVAL seconds with the latest price, even when no tick arrives in that time,
+        so live fills on quiet markets or wicks between ticks are not missed.
+        Network errors on the stream are retried instead of ending the loop.
+        Orders are still placed and queried over the REST client.
+        """
+        stream = self.init_stream_exchange()
+        last_pass = 0.0
+        price: Optional[float] = None
+        watch: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if watch is None:
+                    watch = asyncio.ensure_future(stream.watch_ticker(self.symbol))
+                # The pending watch survives a timeout, so no tick is dropped by the periodic check.
+                timeout = None if price is None else max(0.0, last_pass + POLL_INTERVAL - time.monotonic())
+                done, _ = await asyncio.wait((watch,), timeout=timeout)
+                if done:
+                    finished, watch = watch, None
+                    try:
+                        ticker = finished.result()
+                    except ccxt.NetworkError as exc:
+                        # ccxt.pro reopens the socket on the next watch call; back off briefly first.
+                        logger.warning("[WARN] Przerwany strumien tickera, ponawiam: %s", exc)
+                        await asyncio.sleep(1)
+                        continue
+                    tick_price = ticker.get("last") or ticker.get("close")
+                    if tick_price is None:
+                        continue
+                    price = float(tick_price)
+                    crossed = any(self.is_crossed(order, price) for order in active_orders)
+                    if not crossed and time.monotonic() - last_pass < POLL_INTERVAL:
+                        continue
+
+                active_orders = self.monitor_grid(price)
+                last_pass = time.monotonic()
+                logger.info("Bot dziala. Para: %s, Cena: %s", self.symbol, price)
+        finally:
+            if watch is not None:
+                watch.cancel()
+            await stream.close()
 
     def close(self) -> None:
         """Close SQLite connection."""
         self.conn.close()
 
 
+def start_log_listener() -> QueueListener:
+    """Send log records through a queue so console writes happen on a background thread, not in the trading loop."""
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, console)
+    listener.start()
+    return listener
+
+
 def main() -> None:
+    listener = start_log_listener()
     bot = GridBot()
     try:
         bot.run()
     finally:
         bot.close()
+        # Drains the queue so the last messages are printed before exit.
+        listener.stop()
 
 
 if __name__ == "__main__":
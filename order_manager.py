@@ -2,17 +2,30 @@ import json
 import os
 from typing import List, Dict
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used without it
+    orjson = None
+
 
 class OrderManager:
     """Simple persistence helper for storing and retrieving order snapshots."""
 
-    def __init__(self, filename: str = "orders.json") -> None:
+    def __init__(self, filename: str = "orders.json", pretty: bool = False) -> None:
         self.filename = filename
+        self.pretty = pretty
 
     def save_orders(self, orders: List[Dict]) -> None:
-        """Persist the provided list of orders to disk as pretty JSON."""
-        with open(self.filename, "w", encoding="utf-8") as handle:
-            json.dump(orders, handle, indent=4)
+        """Persist the provided list of orders to disk as compact JSON (indented when ``pretty`` is set)."""
+        if orjson is not None:
+            payload = orjson.dumps(orders, option=orjson.OPT_INDENT_2 if self.pretty else 0)
+        elif self.pretty:
+            payload = json.dumps(orders, indent=2).encode("utf-8")
+        else:
+            payload = json.dumps(orders, separators=(",", ":")).encode("utf-8")
+        # Serialise first and write once: json.dump would issue a write() per token.
+        with open(self.filename, "wb") as handle:
+            handle.write(payload)
 
     def load_orders(self) -> List[Dict]:
         """Reload persisted orders, returning an empty list if the file is unavailable or malformed."""
@@ -20,7 +33,9 @@ class OrderManager:
             return []
 
         try:
-            with open(self.filename, encoding="utf-8") as handle:
-                return json.load(handle)
-        except (json.JSONDecodeError, OSError):
+            with open(self.filename, "rb") as handle:
+                data = handle.read()
+            # Both decoders raise ValueError subclasses on malformed or non-UTF-8 input.
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        except (ValueError, OSError):
             return []
@@ -2,7 +2,6 @@ import sys
 from pathlib import Path
 
 import ccxt
-import yaml
 from dotenv import load_dotenv
 
 
@@ -14,26 +13,23 @@ if str(ROOT_DIR) not in sys.path:
 
 CONFIG_FILE = ROOT_DIR / "config.yaml"
 
+from config_loader import REQUIRED, load_config
+from http_session import build_http_session
 
-def load_config(path: Path = CONFIG_FILE) -> dict:
-    with open(path, encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
-    if not isinstance(data, dict):
-        raise ValueError("config.yaml must be a mapping")
-    required = {"symbol", "lower_price", "upper_price"}
-    missing = required.difference(data)
-    if missing:
-        raise ValueError(f"config.yaml missing keys: {', '.join(missing)}")
-    return data
+SCHEMA = (
+    ("symbol", str, REQUIRED),
+    ("lower_price", float, REQUIRED),
+    ("upper_price", float, REQUIRED),
+)
 
 
 def init_exchange() -> ccxt.Exchange:
     load_dotenv()
-    return ccxt.kucoin({"enableRateLimit": True})
+    return ccxt.kucoin({"enableRateLimit": True, "session": build_http_session()})
 
 
 def main() -> None:
-    config = load_config()
+    config = load_config(CONFIG_FILE, SCHEMA)
     symbol = config["symbol"]
     lower = float(config["lower_price"])
     upper = float(config["upper_price"])
@@ -1,10 +1,17 @@
-import math
+import argparse
+import csv
+import hashlib
+import heapq
+import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, Optional, Sequence, TextIO, Tuple
 
+import numpy as np
 import pandas as pd
-import yaml
 
 
 ROOT_DIR = Path(__file__).resolve().parent
@@ -14,102 +21,153 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 CONFIG_FILE = ROOT_DIR / "config.yaml"
 DATA_DIR = ROOT_DIR / "data"
-
+CACHE_DIR = DATA_DIR / ".sweep_cache"
+LEVEL_SWEEP = range(10, 150, 5)
+HISTORY_COLUMNS = ("timestamp", "open", "high", "low", "close")
+RESULT_FIELDS = (
+    "grid_levels",
+    "grid_profit",
+    "fees_paid",
+    "net_profit",
+    "grid_yield_pct",
+    "profit_fee_ratio",
+    "trades",
+    "end_value",
+    "start_price",
+    "end_price",
+)
+result_row = itemgetter(*RESULT_FIELDS)
+
+import backtest_engine
+import grid_logic
+from backtest_engine import BUY, build_initial_orders, scan_fills_jit, scan_fills_numpy
+from config_loader import load_config
 from grid_logic import GridCalculator
 
+# Every module whose code decides a sweep result; editing any of them invalidates cached results.
+SIMULATOR_SOURCES = (Path(__file__), Path(backtest_engine.__file__), Path(grid_logic.__file__))
 
-def load_config(path: Path = CONFIG_FILE) -> Dict[str, object]:
-    with open(path, encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
-    if not isinstance(data, dict):
-        raise ValueError("config.yaml must map keys to values")
-    required = {"symbol", "lower_price", "upper_price", "grid_levels", "order_size"}
-    missing = required.difference(data)
-    if missing:
-        raise ValueError(f"config.yaml missing values: {', '.join(missing)}")
-    return data
+
+def history_path(symbol: str, timeframe: str = "5m") -> Path:
+    sanitized = symbol.replace("/", "-")
+    return DATA_DIR / f"kucoin_{sanitized}_{timeframe}_2024.csv"
+
+
+def _read_history_cache(cached: Path, source: Path) -> Optional[pd.DataFrame]:
+    """Return the Parquet copy of ``source`` if it is at least as new, else None (also without a Parquet engine)."""
+    try:
+        if cached.stat().st_mtime_ns < source.stat().st_mtime_ns:
+            return None
+        return pd.read_parquet(cached, columns=list(HISTORY_COLUMNS))
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def _write_history_cache(df: pd.DataFrame, cached: Path) -> None:
+    tmp = cached.with_suffix(".tmp")
+    try:
+        df.to_parquet(tmp)
+        os.replace(tmp, cached)
+    except (ImportError, OSError, ValueError):
+        # pyarrow/fastparquet are optional; without them every run parses the CSV.
+        tmp.unlink(missing_ok=True)
 
 
 def load_history_csv(symbol: str, timeframe: str = "5m") -> pd.DataFrame:
-    sanitized = symbol.replace("/", "-")
-    filename = DATA_DIR / f"kucoin_{sanitized}_{timeframe}_2024.csv"
+    filename = history_path(symbol, timeframe)
     if not filename.exists():
         raise FileNotFoundError(f"History file not found: {filename}")
+    # The Parquet copy is written after sorting, so a cache hit is returned as is.
+    cached = filename.with_suffix(".parquet")
+    df = _read_history_cache(cached, filename)
+    if df is not None:
+        return df
     df = pd.read_csv(filename)
-    required_cols = {"timestamp", "open", "high", "low", "close"}
-    missing = required_cols.difference(df.columns)
+    missing = set(HISTORY_COLUMNS).difference(df.columns)
     if missing:
         raise ValueError(f"CSV missing columns: {', '.join(missing)}")
     df.sort_values("timestamp", inplace=True)
+    # Same columns as a cache hit, so callers never see a frame that depends on cache state.
+    df = df[list(HISTORY_COLUMNS)]
+    _write_history_cache(df, cached)
     return df
 
 
-def build_initial_orders(symbol: str, levels: List[float], start_price: float) -> List[Dict[str, object]]:
-    orders: List[Dict[str, object]] = []
-    for level in levels:
-        if math.isclose(level, start_price):
-            continue
-        side = "buy" if level < start_price else "sell"
-        orders.append({"symbol": symbol, "side": side, "price": level})
-    return orders
+# (lows, highs, start_price, end_price): everything the simulator reads from the history.
+Bars = Tuple[np.ndarray, np.ndarray, float, float]
 
 
-def rotate_order(side: str, level: float, grid_step: float) -> Tuple[str, float]:
-    if side == "buy":
-        return "sell", round(level + grid_step, 10)
-    return "buy", round(level - grid_step, 10)
+def bar_arrays(df: pd.DataFrame) -> Bars:
+    """Extract the simulator inputs once; plain arrays are also cheap to ship to worker processes."""
+    return (
+        df["low"].to_numpy(dtype=np.float64),
+        df["high"].to_numpy(dtype=np.float64),
+        float(df.iloc[0]["open"]),
+        float(df.iloc[-1]["close"]),
+    )
 
 
-def simulate_grid(df: pd.DataFrame, grid_levels: int, config: Dict[str, object], start_capital: float = 1000.0):
-    symbol = config["symbol"]
-    order_size = float(config["order_size"])
-    lower_price = float(config["lower_price"])
-    upper_price = float(config["upper_price"])
-    fee_rate = 0.001
+# (order prices, side codes, grid step) of the opening grid for one grid_levels value.
+Grid = Tuple[np.ndarray, np.ndarray, float]
 
-    start_price = float(df.iloc[0]["open"])
-    end_price = float(df.iloc[-1]["close"])
 
-    calculator = GridCalculator(lower_price, upper_price, grid_levels)
+def opening_grid(grid_levels: int, config: Dict[str, object], start_price: float) -> Grid:
+    calculator = GridCalculator(float(config["lower_price"]), float(config["upper_price"]), grid_levels)
     levels = calculator.calculate_levels()
     grid_step = levels[1] - levels[0] if len(levels) > 1 else 0.0
-    orders = build_initial_orders(symbol, levels, start_price)
+    prices, sides = build_initial_orders(levels, start_price)
+    return prices, sides, grid_step
+
+
+def prepare_grids(candidates: Sequence[int], config: Dict[str, object], start_price: float) -> Dict[int, Grid]:
+    """Build every candidate's opening grid up front; the scan copies the arrays, so they can be reused."""
+    return {levels: opening_grid(levels, config, start_price) for levels in candidates}
+
+
+def simulate_grid(df: pd.DataFrame, grid_levels: int, config: Dict[str, object], start_capital: float = 1000.0):
+    return simulate_bars(bar_arrays(df), grid_levels, config, start_capital)
+
+
+def simulate_bars(
+    bars: Bars,
+    grid_levels: int,
+    config: Dict[str, object],
+    start_capital: float = 1000.0,
+    grid: Optional[Grid] = None,
+):
+    order_size = float(config["order_size"])
+    fee_rate = 0.001
+
+    lows, highs, start_price, end_price = bars
+    prices, sides, grid_step = grid if grid is not None else opening_grid(grid_levels, config, start_price)
 
     balance_usdt = start_capital
     balance_coin = 0.0
     grid_profit = 0.0
     fees_paid = 0.0
-    trades = 0
-
-    for _, row in df.iterrows():
-        low = float(row["low"])
-        high = float(row["high"])
-        for order in orders[:]:
-            level = float(order["price"])
-            side = order["side"]
-            filled = (side == "buy" and low <= level) or (side == "sell" and high >= level)
-            if not filled:
-                continue
-
-            value = level * order_size
-            fee = value * fee_rate
-            fees_paid += fee
-            trades += 1
-
-            if side == "buy":
-                balance_usdt -= value
-                balance_coin += order_size
-                balance_usdt -= fee
-                grid_profit -= value
-            else:
-                balance_usdt += value
-                balance_coin -= order_size
-                balance_usdt -= fee
-                grid_profit += value
-
-            opposite_side, new_price = rotate_order(side, level, grid_step)
-            orders.remove(order)
-            orders.append({"symbol": symbol, "side": opposite_side, "price": new_price})
+
+    # The bar scan works on parallel price/side arrays and returns the fills in execution order;
+    # accounting then walks that log so the running sums add up in the same order as fill by fill.
+    # The numba kernel (compiled once and cached on disk) gives the same fills as the NumPy scan.
+    scan_fills = scan_fills_jit if scan_fills_jit is not None else scan_fills_numpy
+    _fill_bars, fill_prices, fill_sides = scan_fills(lows, highs, prices, sides, grid_step)
+    trades = len(fill_prices)
+
+    for level, code in zip(fill_prices.tolist(), fill_sides.tolist()):
+        value = level * order_size
+        fee = value * fee_rate
+        fees_paid += fee
+
+        if code == BUY:
+            balance_usdt -= value
+            balance_coin += order_size
+            balance_usdt -= fee
+            grid_profit -= value
+        else:
+            balance_usdt += value
+            balance_coin -= order_size
+            balance_usdt -= fee
+            grid_profit += value
 
     end_value = balance_usdt + balance_coin * end_price
     net_profit = end_value - start_capital
@@ -129,41 +187,149 @@ def simulate_grid(df: pd.DataFrame, grid_levels: int, config: Dict[str, object],
     }
 
 
-def main() -> None:
-    config = load_config()
+# Set once per worker process by _init_worker so tasks only carry their grid_levels value.
+_WORKER_STATE: Dict[str, object] = {}
+
+
+def _init_worker(bars: Bars, config: Dict[str, object], grids: Dict[int, Grid]) -> None:
+    _WORKER_STATE["bars"] = bars
+    _WORKER_STATE["config"] = config
+    _WORKER_STATE["grids"] = grids
+
+
+def _simulate_in_worker(grid_levels: int) -> Dict[str, object]:
+    return simulate_bars(
+        _WORKER_STATE["bars"], grid_levels, _WORKER_STATE["config"], grid=_WORKER_STATE["grids"][grid_levels]
+    )
+
+
+def iter_sweep(
+    df: pd.DataFrame, config: Dict[str, object], workers: int, candidates: Sequence[int] = LEVEL_SWEEP
+) -> Iterator[Dict[str, object]]:
+    """Yield results for the grid_levels candidates in order, using worker processes when workers > 1."""
+    bars = bar_arrays(df)
+    grids = prepare_grids(candidates, config, bars[2])
+    if workers <= 1 or len(candidates) <= 1:
+        for levels in candidates:
+            yield simulate_bars(bars, levels, config, grid=grids[levels])
+        return
+    # Workers receive the two price columns as arrays instead of a pickled DataFrame.
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(candidates)), initializer=_init_worker, initargs=(bars, config, grids)
+    ) as executor:
+        yield from executor.map(_simulate_in_worker, candidates)
+
+
+def sweep_cache_key(history_file: Path, config: Dict[str, object], split_idx: int) -> str:
+    """Hash every input of a validation run: history file, config, split and the simulator's sources."""
+    history_stat = history_file.stat()
+    parts = (
+        history_file.name,
+        history_stat.st_mtime_ns,
+        history_stat.st_size,
+        split_idx,
+        sorted(config.items()),
+        [(source.name, source.stat().st_mtime_ns) for source in SIMULATOR_SOURCES],
+    )
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def load_cached_result(cache_key: str, grid_levels: int) -> Optional[Dict[str, object]]:
+    try:
+        with (CACHE_DIR / f"{cache_key}-{grid_levels}.json").open(encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def store_cached_result(cache_key: str, result: Dict[str, object]) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    target = CACHE_DIR / f"{cache_key}-{result['grid_levels']}.json"
+    tmp = target.with_suffix(".tmp")
+    tmp.write_bytes(json.dumps(result).encode("utf-8"))
+    os.replace(tmp, target)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep grid_levels on the validation part of the history CSV.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes for the sweep (1 runs sequentially)",
+    )
+    parser.add_argument("--csv", type=Path, help="write every sweep result to this CSV file as it completes")
+    parser.add_argument("--no-cache", action="store_true", help=f"ignore and do not update results cached in {CACHE_DIR}")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    config = load_config(CONFIG_FILE)
     symbol = config["symbol"]
     df = load_history_csv(symbol)
 
     split_idx = int(len(df) * 0.7)
-    df_train = df.iloc[:split_idx].copy()
-    df_val = df.iloc[split_idx:].copy()
+    # The first 70% is the training part and is not read here; the sweep only needs a read-only view of the rest.
+    df_val = df.iloc[split_idx:]
+
+    # Identical inputs give identical results, so reruns only simulate candidates missing from the cache.
+    cache_key = None if args.no_cache else sweep_cache_key(history_path(symbol), config, split_idx)
+    cached: Dict[int, Dict[str, object]] = {}
+    if cache_key is not None:
+        for levels in LEVEL_SWEEP:
+            hit = load_cached_result(cache_key, levels)
+            if hit is not None:
+                cached[levels] = hit
+    pending = [levels for levels in LEVEL_SWEEP if levels not in cached]
 
     # Run optimization on validation set only to avoid overfitting to train.
     results = []
-    for levels in range(10, 150, 5):
-        result = simulate_grid(df_val, levels, config)
-        results.append(result)
+    computed = iter_sweep(df_val, config, args.workers, pending)
+    csv_handle: Optional[TextIO] = args.csv.open("w", newline="", encoding="utf-8") if args.csv else None
+    try:
+        writer = csv.writer(csv_handle) if csv_handle else None
+        if writer is not None:
+            writer.writerow(RESULT_FIELDS)
+        for levels in LEVEL_SWEEP:
+            result = cached.get(levels)
+            if result is None:
+                result = next(computed)
+                if cache_key is not None:
+                    store_cached_result(cache_key, result)
+            results.append(result)
+            if writer is not None:
+                # Flush per row so an interrupted sweep keeps everything finished so far.
+                writer.writerow(result_row(result))
+                csv_handle.flush()
+    finally:
+        computed.close()
+        if csv_handle is not None:
+            csv_handle.close()
 
     if not results:
         print("No configurations evaluated.")
         return
 
-    results.sort(key=lambda r: r["net_profit"], reverse=True)
-    top = results[:10]
+    # nlargest is stable like sorted(), so ties keep sweep order.
+    top = heapq.nlargest(10, results, key=itemgetter("net_profit"))
 
     val_start_price = float(df_val.iloc[0]["open"])
     val_end_price = float(df_val.iloc[-1]["close"])
     start_capital = 1000.0
     buy_hold_profit = (val_end_price - val_start_price) * (start_capital / val_start_price)
 
-    print(f"Validation set length: {len(df_val)} candles")
-    print("Top 10 configurations (by validation net profit):")
-    print(f"{'Levels':>8} | {'Net Profit':>12} | {'P/F Ratio':>10} | {'Trades':>8} | {'Avg Profit/Grid':>16}")
-    print("-" * 64)
+    best = top[0]
+    lines = [
+        f"Validation set length: {len(df_val)} candles",
+        "Top 10 configurations (by validation net profit):",
+        f"{'Levels':>8} | {'Net Profit':>12} | {'P/F Ratio':>10} | {'Trades':>8} | {'Avg Profit/Grid':>16}",
+        "-" * 64,
+    ]
     for r in top:
         warning = " (Ryzowne!)" if r["profit_fee_ratio"] < 5 else ""
         avg_profit = r["net_profit"] / r["grid_levels"] if r["grid_levels"] else 0.0
-        print(
+        lines.append(
             f"{r['grid_levels']:>8} | "
             f"{r['net_profit']:>12.4f} | "
             f"{r['profit_fee_ratio']:>10.2f} | "
@@ -171,15 +337,14 @@ def main() -> None:
             f"{avg_profit:>16.4f}"
             f"{warning}"
         )
-
-    best = top[0]
-    print("\nComparison vs Buy & Hold on validation:")
-    print(f"- Buy & Hold profit: {buy_hold_profit:.4f} USDT")
-    print(f"- Best grid (levels={best['grid_levels']}): net {best['net_profit']:.4f} USDT")
-    print(
-        f"- Profit/Fee ratio: {best['profit_fee_ratio']:.2f}, "
-        f"Grid yield: {best['grid_yield_pct']:.2f}%"
-    )
+    lines += [
+        "\nComparison vs Buy & Hold on validation:",
+        f"- Buy & Hold profit: {buy_hold_profit:.4f} USDT",
+        f"- Best grid (levels={best['grid_levels']}): net {best['net_profit']:.4f} USDT",
+        f"- Profit/Fee ratio: {best['profit_fee_ratio']:.2f}, Grid yield: {best['grid_yield_pct']:.2f}%",
+    ]
+    # One write keeps the report contiguous even if worker processes are still logging.
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
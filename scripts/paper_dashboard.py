@@ -1,11 +1,19 @@
 import csv
+import io
 import os
 import sys
 import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 import ccxt
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 
 
 ROOT_DIR = Path(__file__).resolve().parent
@@ -14,97 +22,164 @@ if not (ROOT_DIR / "config.yaml").exists():
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
+from http_session import build_http_session
+
 HISTORY_FILE = ROOT_DIR / "trade_history.csv"
 CONFIG_FILE = ROOT_DIR / "config.yaml"
+LIVE_PRICE_TTL = 2.0
+
+# symbol -> (time.monotonic() of the last successful fetch, price)
+_LIVE_PRICES: dict[str, tuple[float, float]] = {}
 
 
+@lru_cache(maxsize=1)
 def load_config_symbol() -> str:
     if not CONFIG_FILE.exists():
         return "BTC/USDT"
-    import yaml
-
     with open(CONFIG_FILE, encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
+        data = yaml.load(handle, Loader=_YamlLoader)
     if isinstance(data, dict) and "symbol" in data:
         return data["symbol"]
     return "BTC/USDT"
 
 
+@lru_cache(maxsize=1)
+def live_exchange() -> ccxt.Exchange:
+    # One client for the whole session: building it reruns describe() and opens a new HTTP pool.
+    return ccxt.kucoin({"enableRateLimit": True, "session": build_http_session()})
+
+
 def fetch_live_price(symbol: str) -> float | None:
+    fetched_at, price = _LIVE_PRICES.get(symbol, (0.0, None))
+    if price is not None and time.monotonic() - fetched_at < LIVE_PRICE_TTL:
+        return price
     try:
-        exchange = ccxt.kucoin({"enableRateLimit": True})
-        ticker = exchange.fetch_ticker(symbol)
-        return ticker.get("last") or ticker.get("close")
+        # Transient HTTP errors are already retried with backoff by the pooled session.
+        ticker = live_exchange().fetch_ticker(symbol)
     except Exception:
-        return None
+        # Keep showing the last known price rather than dropping the line.
+        return price
+    price = ticker.get("last") or ticker.get("close")
+    if price is not None:
+        _LIVE_PRICES[symbol] = (time.monotonic(), price)
+    return price
+
+
+def enable_ansi() -> None:
+    if os.name == "nt":
+        # An empty command switches the Windows console to VT escape processing.
+        os.system("")
 
 
 def clear_screen() -> None:
-    os.system("cls" if os.name == "nt" else "clear")
-
-
-def load_trades() -> list[dict]:
-    trades = []
-    if not HISTORY_FILE.exists():
-        return trades
-    with open(HISTORY_FILE, encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            trades.append(row)
-    return trades
-
-
-def summarize(trades: list[dict]) -> dict:
-    if not trades:
-        return {}
-    fees = 0.0
-    cashflow = 0.0
-    first_ts = None
-    for row in trades:
+    # Escape sequence instead of spawning cls/clear on every refresh.
+    sys.stdout.write("\x1b[2J\x1b[H")
+
+
+def parse_timestamp(ts_str: str | None) -> datetime:
+    try:
+        return datetime.fromisoformat(ts_str)
+    except Exception:
         try:
-            fee = float(row.get("fee_estimated", 0.0))
-            price = float(row.get("price", 0.0))
-            amount = float(row.get("amount", 0.0))
-            side = str(row.get("side", "")).lower()
-        except (TypeError, ValueError):
-            continue
-        fees += fee
-        value = price * amount
-        if side == "sell":
-            cashflow += value
-        else:
-            cashflow -= value
-        if first_ts is None:
-            ts_str = row.get("timestamp")
+            return datetime.fromtimestamp(float(ts_str), tz=timezone.utc)
+        except Exception:
+            return datetime.now(timezone.utc)
+
+
+class TradeHistoryTail:
+    """Running totals over the trade history that only parse rows appended since the last refresh."""
+
+    def __init__(self, path: Path = HISTORY_FILE) -> None:
+        self.path = path
+        self.reset()
+
+    def reset(self) -> None:
+        self._offset = 0
+        self._columns: dict[str, int] | None = None
+        self.fees = 0.0
+        self.cashflow = 0.0
+        self.count = 0
+        self.first_ts: datetime | None = None
+        self.last_price = 0.0
+
+    def refresh(self) -> dict:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            self.reset()
+            return {}
+        if size < self._offset:
+            # Truncated or replaced file: start over from the header.
+            self.reset()
+        if size > self._offset:
+            with open(self.path, "rb") as handle:
+                handle.seek(self._offset)
+                chunk = handle.read(size - self._offset)
+            # A row the bot is still writing has no newline yet; it is picked up on the next refresh.
+            end = chunk.rfind(b"\n") + 1
+            self._offset += end
+            self._consume(chunk[:end].decode("utf-8"))
+        return self.summary()
+
+    def _consume(self, text: str) -> None:
+        rows = csv.reader(io.StringIO(text, newline=""))
+        if self._columns is None:
+            # Blank lines (or the empty row a doubled CR leaves) carry no header and no trade.
+            header = next((row for row in rows if row), None)
+            if header is None:
+                return
+            self._columns = {name: index for index, name in enumerate(header)}
+        columns = self._columns
+        fee_col = columns.get("fee_estimated")
+        price_col = columns.get("price")
+        amount_col = columns.get("amount")
+        side_col = columns.get("side")
+        ts_col = columns.get("timestamp")
+        for row in rows:
+            if not row:
+                continue
             try:
-                first_ts = datetime.fromisoformat(ts_str)
-            except Exception:
-                try:
-                    first_ts = datetime.fromtimestamp(float(ts_str), tz=timezone.utc)
-                except Exception:
-                    first_ts = datetime.now(timezone.utc)
-    profit = cashflow - fees
-    last_trade_price = float(trades[-1].get("price", 0.0))
-    return {
-        "profit": profit,
-        "fees": fees,
-        "count": len(trades),
-        "first_ts": first_ts,
-        "last_price": last_trade_price,
-    }
+                fee = float(row[fee_col]) if fee_col is not None else 0.0
+                price = float(row[price_col]) if price_col is not None else 0.0
+                amount = float(row[amount_col]) if amount_col is not None else 0.0
+                side = row[side_col].lower() if side_col is not None else ""
+            except (IndexError, ValueError):
+                continue
+            self.count += 1
+            self.fees += fee
+            value = price * amount
+            if side == "sell":
+                self.cashflow += value
+            else:
+                self.cashflow -= value
+            self.last_price = price
+            if self.first_ts is None:
+                self.first_ts = parse_timestamp(row[ts_col] if ts_col is not None and ts_col < len(row) else None)
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {}
+        return {
+            "profit": self.cashflow - self.fees,
+            "fees": self.fees,
+            "count": self.count,
+            "first_ts": self.first_ts,
+            "last_price": self.last_price,
+        }
 
 
 def main() -> None:
+    enable_ansi()
     symbol = load_config_symbol()
+    history = TradeHistoryTail()
     while True:
-        trades = load_trades()
+        summary = history.refresh()
         clear_screen()
-        if not trades:
+        if not summary:
             print("Oczekiwanie na pierwszą transakcję bota...")
             time.sleep(5)
             continue
 
-        summary = summarize(trades)
         now = datetime.now(timezone.utc)
         runtime = ""
         if summary["first_ts"]:
@@ -0,0 +1,185 @@
+import contextlib
+import io
+import math
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import backtest_engine
+from backtest_engine import build_initial_orders, round_price, scan_fills_jit, scan_fills_numpy
+from grid_logic import GridCalculator
+
+
+def random_walk_bars(seed: int, count: int, start: float, spread: float):
+    rng = random.Random(seed)
+    lows, highs = [], []
+    price = start
+    for _ in range(count):
+        price += rng.uniform(-spread, spread)
+        lows.append(price - rng.uniform(0.0, spread))
+        highs.append(price + rng.uniform(0.0, spread))
+    return np.array(lows, dtype=np.float64), np.array(highs, dtype=np.float64)
+
+
+def reference_fills(lows, highs, levels, start_price, grid_step):
+    """The per-bar order loop the scans replaced: fills are checked against a snapshot of the book."""
+    orders = [
+        {"side": "buy" if level < start_price else "sell", "price": level}
+        for level in levels
+        if not math.isclose(level, start_price)
+    ]
+    fills = []
+    for bar, (low, high) in enumerate(zip(lows, highs)):
+        for order in orders[:]:
+            level, side = order["price"], order["side"]
+            if not ((side == "buy" and low <= level) or (side == "sell" and high >= level)):
+                continue
+            fills.append((bar, level, side))
+            orders.remove(order)
+            if side == "buy":
+                orders.append({"side": "sell", "price": round(level + grid_step, 10)})
+            else:
+                orders.append({"side": "buy", "price": round(level - grid_step, 10)})
+    return fills
+
+
+# Grid 100..200 in steps of 25, opened at 150 so that level is skipped.
+FIXTURE_LEVELS = [100.0, 125.0, 150.0, 175.0, 200.0]
+FIXTURE_BARS = [
+    # (low, high)
+    (140.0, 160.0),  # inside the spread: nothing fills
+    (125.0, 150.0),  # low touches the 125 buy exactly; its 150 sell must wait for the next bar
+    (100.0, 175.0),  # one bar crosses a buy and two sells
+    (130.0, 200.0),  # high touches the 200 sell exactly
+    (99.0, 101.0),
+    (150.0, 150.0),
+    (120.0, 180.0),
+]
+
+
+def fixture_bars():
+    lows = np.array([low for low, _high in FIXTURE_BARS], dtype=np.float64)
+    highs = np.array([high for _low, high in FIXTURE_BARS], dtype=np.float64)
+    return lows, highs
+
+
+class ScanFillsReferenceTests(unittest.TestCase):
+
+    def assert_matches_reference(self, scan, lows, highs, levels, start_price):
+        grid_step = levels[1] - levels[0]
+        prices, sides = build_initial_orders(levels, start_price)
+        fill_bars, fill_prices, fill_sides = scan(lows, highs, prices, sides, grid_step)
+        actual = [
+            (bar, price, backtest_engine.SIDE_NAMES[code])
+            for bar, price, code in zip(fill_bars.tolist(), fill_prices.tolist(), fill_sides.tolist())
+        ]
+        expected = reference_fills(lows.tolist(), highs.tolist(), levels, start_price, grid_step)
+        self.assertEqual(actual, expected)
+        return expected
+
+    def scans(self):
+        return [scan for scan in (scan_fills_numpy, scan_fills_jit) if scan is not None]
+
+    def test_fixture_matches_reference_loop(self):
+        lows, highs = fixture_bars()
+        for scan in self.scans():
+            with self.subTest(scan=scan.__name__):
+                fills = self.assert_matches_reference(scan, lows, highs, FIXTURE_LEVELS, 150.0)
+                self.assertEqual(
+                    fills[:5],
+                    [(1, 125.0, "buy"), (2, 100.0, "buy"), (2, 175.0, "sell"), (2, 150.0, "sell"), (3, 200.0, "sell")],
+                )
+
+    def test_random_walk_matches_reference_loop(self):
+        calculator = GridCalculator(80000.0, 100000.0, 15)
+        levels = calculator.calculate_levels()
+        lows, highs = random_walk_bars(5, 3000, 90000.0, 900.0)
+        for scan in self.scans():
+            with self.subTest(scan=scan.__name__):
+                self.assertGreater(len(self.assert_matches_reference(scan, lows, highs, levels, 90000.0)), 100)
+
+    def test_run_backtest_reports_reference_pnl(self):
+        lows, highs = fixture_bars()
+        frame = pd.DataFrame(
+            {
+                "timestamp": np.arange(len(lows), dtype=np.int64) * 300_000,
+                "open": [150.0] + highs[:-1].tolist(),
+                "high": highs,
+                "low": lows,
+                "close": [(low + high) / 2 for low, high in FIXTURE_BARS],
+                "volume": 1.0,
+            }
+        )
+        config = {"symbol": "BTC/USDT", "lower_price": 100.0, "upper_price": 200.0, "grid_levels": 4, "order_size": 0.5}
+
+        fills = reference_fills(lows.tolist(), highs.tolist(), FIXTURE_LEVELS, 150.0, 25.0)
+        values = [price * 0.5 for _bar, price, _side in fills]
+        fees = sum(value * 0.001 for value in values)
+        grid_profit = sum(value if side == "sell" else -value for value, (_bar, _price, side) in zip(values, fills))
+        coin = sum(0.5 if side == "buy" else -0.5 for _bar, _price, side in fills)
+        # Fees are reported on their own; the USDT balance only moves by the traded value.
+        end_value = 1000.0 + grid_profit + coin * frame["close"].iloc[-1]
+
+        for jit in (scan_fills_jit, None):
+            with self.subTest(jit=jit is not None):
+                output = io.StringIO()
+                with mock.patch.object(backtest_engine, "load_config", return_value=config), mock.patch.object(
+                    backtest_engine, "load_history_csv", return_value=frame.copy()
+                ), mock.patch.object(backtest_engine, "scan_fills_jit", jit), contextlib.redirect_stdout(output):
+                    backtest_engine.run_backtest()
+                report = output.getvalue()
+                self.assertIn(f"Grid Profit (gross): {grid_profit:.4f} USDT", report)
+                self.assertIn(f"Fees paid: {fees:.4f} USDT", report)
+                self.assertIn(f"End portfolio value: {end_value:.4f} USDT", report)
+
+
+class RoundPriceTests(unittest.TestCase):
+
+    def test_matches_builtin_round(self):
+        rng = random.Random(7)
+        samples = [rng.uniform(-600000.0, 600000.0) for _ in range(20000)]
+        samples += [rng.uniform(80000.0, 100000.0) + 1333.3333333333 for _ in range(20000)]
+        # Products that land exactly on a half, on both sides of 2**52 / 1e10.
+        samples += [1000.0 + i * 2.0 ** -11 for i in range(1, 200)]
+        samples += [450360.0 + i * 2.0 ** -11 for i in range(1, 200)]
+        samples += [0.0, -0.0, 2.5e-10, -2.5e-10, float("inf")]
+        for price in samples:
+            self.assertEqual(round_price(price), round(price, 10), price)
+            self.assertEqual(backtest_engine._round_price(price), round(price, 10), price)
+
+
+@unittest.skipUnless(scan_fills_jit, "numba is not installed")
+class ScanFillsJitTests(unittest.TestCase):
+
+    def test_jit_scan_matches_numpy_scan(self):
+        for grid_levels, seed in ((15, 1), (40, 2), (23, 3)):
+            with self.subTest(grid_levels=grid_levels):
+                calculator = GridCalculator(80000.0, 100000.0, grid_levels)
+                levels = calculator.calculate_levels()
+                lows, highs = random_walk_bars(seed, 5000, 90000.0, 700.0)
+                prices, sides = build_initial_orders(levels, 90000.0)
+                expected = scan_fills_numpy(lows, highs, prices, sides, levels[1] - levels[0])
+                actual = scan_fills_jit(lows, highs, prices, sides, levels[1] - levels[0])
+                self.assertGreater(len(expected[0]), 100)
+                for want, got in zip(expected, actual):
+                    np.testing.assert_array_equal(want, got)
+
+    def test_rotation_rounds_like_builtin_round(self):
+        # level + step lands where numba's round(x, 10) picks the other neighbour.
+        level = 112768.33333333334 - 1.0
+        lows = np.array([level - 5.0, level + 10.0])
+        highs = np.array([level + 0.5, level + 10.0])
+        prices = np.array([level])
+        sides = np.array([backtest_engine.BUY], dtype=np.int8)
+        for scan in (scan_fills_numpy, scan_fills_jit):
+            with self.subTest(scan=scan.__name__):
+                _bars, fill_prices, fill_sides = scan(lows, highs, prices, sides, 1.0)
+                self.assertEqual(fill_prices.tolist(), [level, round(level + 1.0, 10)])
+                self.assertEqual(fill_sides.tolist(), [backtest_engine.BUY, backtest_engine.SELL])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from config_loader import REQUIRED, clear_cache, load_config, parse_bool
+
+
+class LoadConfigTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "config.yaml"
+        clear_cache()
+
+    def tearDown(self) -> None:
+        clear_cache()
+        self.tmpdir.cleanup()
+
+    def write(self, text: str) -> None:
+        self.path.write_text(text, encoding="utf-8")
+
+    def test_grid_schema_coerces_values(self) -> None:
+        self.write('symbol: "BTC/USDT"\nlower_price: 100\nupper_price: "200"\ngrid_levels: 4.0\norder_size: 1\n')
+        config = load_config(self.path)
+        self.assertEqual(config["lower_price"], 100.0)
+        self.assertIsInstance(config["lower_price"], float)
+        self.assertEqual(config["upper_price"], 200.0)
+        self.assertEqual(config["grid_levels"], 4)
+        self.assertIsInstance(config["grid_levels"], int)
+        self.assertEqual(config["order_size"], 1.0)
+
+    def test_missing_keys_raise(self) -> None:
+        self.write('symbol: "BTC/USDT"\nlower_price: 100\n')
+        with self.assertRaises(ValueError) as ctx:
+            load_config(self.path)
+        self.assertIn("grid_levels, order_size, upper_price", str(ctx.exception))
+
+    def test_non_mapping_and_missing_file_raise(self) -> None:
+        self.write("- just\n- a list\n")
+        with self.assertRaises(ValueError):
+            load_config(self.path)
+        with self.assertRaises(FileNotFoundError):
+            load_config(self.path.with_name("absent.yaml"))
+
+    def test_custom_schema_applies_defaults(self) -> None:
+        self.write('symbol: "BTC/USDT"\n')
+        schema = (("symbol", str, REQUIRED), ("testnet", parse_bool, False))
+        self.assertEqual(load_config(self.path, schema), {"symbol": "BTC/USDT", "testnet": False})
+
+    def test_bool_settings_are_parsed_strictly(self) -> None:
+        schema = (("symbol", str, REQUIRED), ("testnet", parse_bool, False), ("sqlite_wal", parse_bool, True))
+        self.write('symbol: "BTC/USDT"\ntestnet: "false"\nsqlite_wal: "True"\n')
+        config = load_config(self.path, schema)
+        self.assertIs(config["testnet"], False)
+        self.assertIs(config["sqlite_wal"], True)
+
+        for bad in ('"no"', "1", '""'):
+            self.write(f'symbol: "BTC/USDT"\ntestnet: {bad}\n')
+            stat = self.path.stat()
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            with self.subTest(value=bad), self.assertRaises(ValueError) as ctx:
+                load_config(self.path, schema)
+            self.assertIn("'testnet'", str(ctx.exception))
+
+    def test_invalid_value_names_the_key(self) -> None:
+        self.write('symbol: "BTC/USDT"\nlower_price: "low"\nupper_price: 200\ngrid_levels: 4\norder_size: 1\n')
+        with self.assertRaises(ValueError) as ctx:
+            load_config(self.path)
+        self.assertIn("'lower_price'", str(ctx.exception))
+        self.assertIn("'low'", str(ctx.exception))
+
+    def test_cache_returns_copies_and_tracks_changes(self) -> None:
+        schema = (("symbol", str, REQUIRED),)
+        self.write('symbol: "BTC/USDT"\n')
+        first = load_config(self.path, schema)
+        first["symbol"] = "mutated"
+        self.assertEqual(load_config(self.path, schema)["symbol"], "BTC/USDT")
+
+        self.write('symbol: "ETH/USDT"\n')
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(load_config(self.path, schema)["symbol"], "ETH/USDT")
+
+    def test_sidecar_reused_while_file_is_unchanged(self) -> None:
+        schema = (("symbol", str, REQUIRED),)
+        self.write('symbol: "BTC/USDT"\n')
+        load_config(self.path, schema)
+        sidecar = self.path.with_name(".config.cache.json")
+        self.assertTrue(sidecar.exists())
+
+        # A new process starts with an empty memo; the sidecar must be used, not the YAML.
+        payload = json.loads(sidecar.read_text(encoding="utf-8"))
+        payload["data"]["symbol"] = "FROM/SIDECAR"
+        sidecar.write_text(json.dumps(payload), encoding="utf-8")
+        clear_cache()
+        self.assertEqual(load_config(self.path, schema)["symbol"], "FROM/SIDECAR")
+
+        self.write('symbol: "ETH/USDT"\n')
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        clear_cache()
+        self.assertEqual(load_config(self.path, schema)["symbol"], "ETH/USDT")
+
+    def test_values_json_cannot_hold_skip_the_sidecar(self) -> None:
+        self.write("symbol: BTC/USDT\nstarted: 2024-01-01\n")
+        schema = (("symbol", str, REQUIRED), ("started", str, None))
+        self.assertEqual(load_config(self.path, schema)["started"], "2024-01-01")
+        self.assertEqual(sorted(p.name for p in Path(self.tmpdir.name).iterdir()), ["config.yaml"])
+
+    def test_non_string_keys_skip_the_sidecar(self) -> None:
+        self.write("symbol: BTC/USDT\nlimits:\n  1: 100\n")
+        schema = (("symbol", str, REQUIRED),)
+        cold = load_config(self.path, schema)
+        self.assertEqual(cold["limits"], {1: 100})
+        self.assertFalse(self.path.with_name(".config.cache.json").exists())
+        clear_cache()
+        self.assertEqual(load_config(self.path, schema), cold)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from grid_logic import GridCalculator
+from grid_logic import BreakEvenSolver, GridCalculator, grid_step_pct
 
 
 class GridCalculatorTests(unittest.TestCase):
@@ -10,6 +10,14 @@ class GridCalculatorTests(unittest.TestCase):
         result = calc.calculate_levels()
         self.assertEqual(len(result), 5)
         self.assertEqual(result, [100.0, 125.0, 150.0, 175.0, 200.0])
+        self.assertEqual(calc.step, 25.0)
+        self.assertEqual(calc.levels, tuple(result))
+
+    def test_calculate_levels_returns_independent_lists(self):
+        calc = GridCalculator(lower_price=100.0, upper_price=200.0, grid_levels=4)
+        first = calc.calculate_levels()
+        first.append(999.0)
+        self.assertEqual(calc.calculate_levels(), [100.0, 125.0, 150.0, 175.0, 200.0])
 
     def test_float_precision(self):
         calc = GridCalculator(lower_price=0.1, upper_price=0.2, grid_levels=5)
@@ -29,11 +37,43 @@ class GridCalculatorTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             GridCalculator(lower_price=1.0, upper_price=2.0, grid_levels=0)
 
+    def test_next_order_plan_matches_rotation(self):
+        calc = GridCalculator(lower_price=80000.0, upper_price=100000.0, grid_levels=15)
+        self.assertEqual(calc.next_order_plan[("buy", 80000.0)], ("sell", round(80000.0 + calc.step, 10)))
+        self.assertEqual(calc.next_order_plan[("sell", 100000.0)], ("buy", round(100000.0 - calc.step, 10)))
+        for key, rotated in calc.next_order_plan.items():
+            self.assertEqual(rotated, calc.next_order(*key))
+
     def test_single_level(self):
         calc = GridCalculator(lower_price=50.0, upper_price=60.0, grid_levels=1)
         result = calc.calculate_levels()
         self.assertEqual(result, [50.0, 60.0])
 
 
+class GridStepPctTests(unittest.TestCase):
+
+    def test_step_relative_to_price(self):
+        self.assertAlmostEqual(grid_step_pct(80000.0, 100000.0, 10, 100000.0), 2.0)
+        self.assertAlmostEqual(grid_step_pct(100.0, 200.0, 4, 125.0), 20.0)
+
+    def test_matches_calculator_step(self):
+        calc = GridCalculator(lower_price=80000.0, upper_price=100000.0, grid_levels=15)
+        self.assertAlmostEqual(grid_step_pct(80000.0, 100000.0, 15, 90000.0), calc.step / 90000.0 * 100.0)
+
+
+class BreakEvenSolverTests(unittest.TestCase):
+
+    def test_arithmetic_levels_keep_step_above_threshold(self):
+        solver = BreakEvenSolver(80000.0, 100000.0)
+        levels = solver.arithmetic_levels(0.2, 90000.0)
+        self.assertEqual(levels, 111)
+        self.assertGreaterEqual(grid_step_pct(80000.0, 100000.0, levels, 90000.0), 0.2)
+        self.assertLess(grid_step_pct(80000.0, 100000.0, levels + 1, 90000.0), 0.2)
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            BreakEvenSolver(200.0, 100.0)
+
+
 if __name__ == "__main__":
     unittest.main()
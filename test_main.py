@@ -0,0 +1,108 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPT = Path(__file__).with_name("main.py")
+
+
+class FakeNetworkError(Exception):
+    pass
+
+
+class FakeInsufficientFunds(Exception):
+    pass
+
+
+def load_main():
+    # A dry run never reaches the exchange, so ccxt and dotenv are stand-ins.
+    fake_ccxt = mock.MagicMock(NetworkError=FakeNetworkError, InsufficientFunds=FakeInsufficientFunds)
+    fake_ccxt.kucoin.return_value.id = "kucoin"
+    spec = importlib.util.spec_from_file_location("grid_main", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {"ccxt": fake_ccxt, "dotenv": mock.MagicMock()}):
+        spec.loader.exec_module(module)
+    return module
+
+
+class DryRunGridBotTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.main = load_main()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        config = Path(self.tmpdir.name) / "config.yaml"
+        config.write_text(
+            'symbol: "BTC/USDT"\nlower_price: 100.0\nupper_price: 200.0\ngrid_levels: 4\norder_size: 0.5\n',
+            encoding="utf-8",
+        )
+        credentials = {"KUCOIN_API_KEY": "key", "KUCOIN_API_SECRET": "secret", "KUCOIN_PASSPHRASE": "pass"}
+        with mock.patch.dict(os.environ, credentials):
+            self.bot = self.main.GridBot(config_path=config, db_path=Path(":memory:"), dry_run=True)
+
+    def tearDown(self) -> None:
+        self.bot.conn.close()
+        self.tmpdir.cleanup()
+
+    def stored_orders(self):
+        # load_active_orders reseeds the mirror; put the bot's own copy back so later passes keep using it.
+        mirror = self.bot._active_orders
+        try:
+            return self.bot.load_active_orders()
+        finally:
+            self.bot._active_orders = mirror
+
+    def assert_mirror_matches_db(self) -> None:
+        self.assertEqual(self.bot._active_orders, self.stored_orders())
+
+    def book(self):
+        return [(order["side"], order["price"]) for order in self.stored_orders()]
+
+    def trades(self):
+        rows = self.bot.conn.execute("SELECT side, price, amount, value FROM trades_history ORDER BY id")
+        return [tuple(row) for row in rows]
+
+    def test_monitor_grid_keeps_mirror_and_tables_in_step(self) -> None:
+        self.bot.place_initial_grid(160.0)
+        self.assert_mirror_matches_db()
+        self.assertEqual(
+            self.book(), [("buy", 100.0), ("buy", 125.0), ("buy", 150.0), ("sell", 175.0), ("sell", 200.0)]
+        )
+
+        # The 150 buy fills; its 175 sell replacement gets the same simulated id as the resting 175 sell.
+        self.bot.monitor_grid(150.0)
+        self.assert_mirror_matches_db()
+        self.assertEqual(self.book(), [("buy", 100.0), ("buy", 125.0), ("sell", 200.0), ("sell", 175.0)])
+        self.assertEqual(self.trades(), [("buy", 150.0, 0.5, 75.0)])
+
+        # The 175 sell fills and rotates back to a 150 buy, reusing the id of the order filled above.
+        self.bot.monitor_grid(180.0)
+        self.assert_mirror_matches_db()
+        self.assertEqual(self.book(), [("buy", 100.0), ("buy", 125.0), ("sell", 200.0), ("buy", 150.0)])
+        self.assertIn("sim_BTC/USDT_150.0", [order["id"] for order in self.bot._active_orders])
+
+        # Nothing is crossed inside the spread: no trades and no writes.
+        self.bot.monitor_grid(160.0)
+        self.assert_mirror_matches_db()
+
+        # One pass that fills two buys at once.
+        self.bot.monitor_grid(120.0)
+        self.assert_mirror_matches_db()
+        self.assertEqual(self.book(), [("buy", 100.0), ("sell", 200.0), ("sell", 150.0), ("sell", 175.0)])
+        self.assertEqual(
+            self.trades(),
+            [
+                ("buy", 150.0, 0.5, 75.0),
+                ("sell", 175.0, 0.5, 87.5),
+                ("buy", 125.0, 0.5, 62.5),
+                ("buy", 150.0, 0.5, 75.0),
+            ],
+        )
+        ids = [order["id"] for order in self.bot._active_orders]
+        self.assertEqual(len(ids), len(set(ids)))
+
+
+if __name__ == "__main__":
+    unittest.main()
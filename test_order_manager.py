@@ -1,6 +1,8 @@
 import os
 import unittest
+from unittest import mock
 
+import order_manager
 from order_manager import OrderManager
 
 
@@ -20,6 +22,24 @@ class OrderManagerTests(unittest.TestCase):
         loaded = self.manager.load_orders()
         self.assertEqual(loaded, orders)
 
+    def test_stdlib_fallback_round_trip(self) -> None:
+        orders = [{"id": "sim_BTC/USDT_80000.0", "price": 80000.0, "side": "buy"}]
+        with mock.patch.object(order_manager, "orjson", None):
+            self.manager.save_orders(orders)
+            self.assertEqual(self.manager.load_orders(), orders)
+        self.assertEqual(self.manager.load_orders(), orders)
+
+    def test_compact_by_default_and_pretty_on_request(self) -> None:
+        orders = [{"id": 1, "price": 100}]
+        self.manager.save_orders(orders)
+        with open(self.filename, encoding="utf-8") as handle:
+            self.assertEqual(handle.read(), '[{"id":1,"price":100}]')
+
+        OrderManager(self.filename, pretty=True).save_orders(orders)
+        with open(self.filename, encoding="utf-8") as handle:
+            self.assertIn('\n  {\n    "id": 1', handle.read())
+        self.assertEqual(self.manager.load_orders(), orders)
+
     def test_load_corrupted_file_returns_empty(self) -> None:
         with open(self.filename, "w", encoding="utf-8") as handle:
             handle.write("BŁĄD")
@@ -0,0 +1,59 @@
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPT = Path(__file__).with_name("scripts") / "paper_dashboard.py"
+
+
+def load_dashboard():
+    # The dashboard only needs ccxt for live prices; the trade tail is exercised without it.
+    spec = importlib.util.spec_from_file_location("paper_dashboard", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {"ccxt": mock.MagicMock()}):
+        spec.loader.exec_module(module)
+    return module
+
+
+HEADER = b"timestamp,symbol,side,price,amount,value,fee_estimated\n"
+
+
+class TradeHistoryTailTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dashboard = load_dashboard()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "trade_history.csv"
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def append(self, data: bytes) -> None:
+        with self.path.open("ab") as handle:
+            handle.write(data)
+
+    def test_blank_lines_and_crlf_rows_are_not_trades(self) -> None:
+        tail = self.dashboard.TradeHistoryTail(self.path)
+        self.append(HEADER + b"\n2025-12-16T18:52:23,BTC/USDT,sell,100.0,1.0,100.0,0.1\n\n")
+        first = tail.refresh()
+        self.assertEqual(first["count"], 1)
+
+        self.append(b"2025-12-16T18:53:00,BTC/USDT,buy,90.0,1.0,90.0,0.09\r\r\n\r\n")
+        second = tail.refresh()
+        self.assertEqual(second["count"], 2)
+        self.assertAlmostEqual(second["fees"], 0.19)
+        self.assertAlmostEqual(second["profit"], 100.0 - 90.0 - 0.19)
+        self.assertEqual(second["last_price"], 90.0)
+
+    def test_partial_row_waits_for_its_newline(self) -> None:
+        tail = self.dashboard.TradeHistoryTail(self.path)
+        self.append(HEADER + b"2025-12-16T18:52:23,BTC/USDT,sell,100.0,1.0,")
+        self.assertEqual(tail.refresh(), {})
+        self.append(b"100.0,0.1\n")
+        self.assertEqual(tail.refresh()["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()